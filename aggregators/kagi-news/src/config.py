@@ -4,16 +4,29 @@ Configuration Loader for Kagi News Aggregator.
 Loads and validates configuration from YAML files.
 """
 import os
+import re
+import copy
+import json
 import logging
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 import yaml
-from urllib.parse import urlparse
+
+# Use the libyaml-backed C loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YAMLLoader
+except ImportError:
+    from yaml import SafeLoader as _YAMLLoader  # type: ignore[assignment]
 
 from src.models import AggregatorConfig, FeedConfig
 
 logger = logging.getLogger(__name__)
 
+# "scheme://netloc" prefix; all the URL validation needs, without urlparse
+_URL_RE = re.compile(r'^([A-Za-z][A-Za-z0-9+.-]*)://([^/?#\s]+)')
+_VALID_URL_SCHEMES = frozenset({'http', 'https'})
+
 
 class ConfigError(Exception):
     """Configuration error."""
@@ -29,8 +42,16 @@ class ConfigLoader:
     - Environment variable overrides
     - Validation of required fields
     - URL validation
+    - In-process caching of loaded configs (keyed by path, mtime and size)
+    - A JSON sidecar of the parsed YAML for faster cold starts
     """
 
+    # Maximum number of config files cached per process
+    CACHE_SIZE = 16
+
+    # resolved path -> ((mtime_ns, size, COVES_API_URL), config)
+    _CACHE: "OrderedDict[str, Tuple[Tuple, AggregatorConfig]]" = OrderedDict()
+
     def __init__(self, config_path: Path):
         """
         Initialize config loader.
@@ -39,13 +60,15 @@ class ConfigLoader:
             config_path: Path to config.yaml file
         """
         self.config_path = Path(config_path)
+        # Parsed YAML data cached as JSON, e.g. config.yaml -> .config.cache.json
+        self.cache_path = self.config_path.with_name(f".{self.config_path.stem}.cache.json")
 
     def load(self) -> AggregatorConfig:
         """
         Load and validate configuration.
 
         Returns:
-            AggregatorConfig object
+            AggregatorConfig object (a fresh copy on every call)
 
         Raises:
             ConfigError: If config is invalid or missing
@@ -54,22 +77,90 @@ class ConfigLoader:
         if not self.config_path.exists():
             raise ConfigError(f"Configuration file not found: {self.config_path}")
 
-        # Load YAML
-        try:
-            with open(self.config_path, 'r') as f:
-                config_data = yaml.safe_load(f)
-        except yaml.YAMLError as e:
-            raise ConfigError(f"Failed to parse YAML: {e}")
+        # Reuse the cached config while the file (and env override) is unchanged
+        stat = self.config_path.stat()
+        cache_key = str(self.config_path.resolve())
+        signature = (stat.st_mtime_ns, stat.st_size, os.getenv('COVES_API_URL'))
+
+        cached = self._CACHE.get(cache_key)
+        if cached is not None and cached[0] == signature:
+            self._CACHE.move_to_end(cache_key)
+            return copy.deepcopy(cached[1])
+
+        # Load YAML (or its JSON sidecar when the YAML hasn't changed)
+        config_data = self._read_cache_file(stat)
+        from_yaml = config_data is None
+        if from_yaml:
+            try:
+                with open(self.config_path, 'r') as f:
+                    config_data = yaml.load(f, Loader=_YAMLLoader)
+            except yaml.YAMLError as e:
+                raise ConfigError(f"Failed to parse YAML: {e}")
 
         if not config_data:
             raise ConfigError("Configuration file is empty")
 
         # Validate and parse
         try:
-            return self._parse_config(config_data)
+            config = self._parse_config(config_data)
         except Exception as e:
             raise ConfigError(f"Invalid configuration: {e}")
 
+        if from_yaml:
+            self._write_cache_file(stat, config_data)
+
+        self._CACHE[cache_key] = (signature, config)
+        if len(self._CACHE) > self.CACHE_SIZE:
+            self._CACHE.popitem(last=False)
+
+        return copy.deepcopy(config)
+
+    def _read_cache_file(self, stat: os.stat_result) -> Optional[Dict[str, Any]]:
+        """
+        Read parsed YAML data from the JSON sidecar.
+
+        Args:
+            stat: Current stat of the YAML file
+
+        Returns:
+            Cached YAML data, or None if the sidecar is missing or stale
+        """
+        try:
+            with open(self.cache_path, 'r') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(cached, dict):
+            return None
+        if cached.get('mtime_ns') != stat.st_mtime_ns or cached.get('size') != stat.st_size:
+            return None
+
+        return cached.get('data')
+
+    def _write_cache_file(self, stat: os.stat_result, data: Dict[str, Any]):
+        """
+        Write parsed YAML data to the JSON sidecar.
+
+        Failures (read-only mount, non-JSON YAML values) are logged and
+        ignored; the next load simply parses the YAML again.
+
+        Args:
+            stat: Stat of the YAML file the data was parsed from
+            data: Parsed YAML data
+        """
+        temp_file = self.cache_path.with_name(self.cache_path.name + '.tmp')
+        try:
+            payload = json.dumps({
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'data': data
+            })
+            temp_file.write_text(payload)
+            os.replace(temp_file, self.cache_path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.debug(f"Not caching parsed config at {self.cache_path}: {e}")
+
     def _parse_config(self, data: Dict[str, Any]) -> AggregatorConfig:
         """
         Parse and validate configuration data.
@@ -95,6 +186,13 @@ class ConfigLoader:
         # Get log level (default to info)
         log_level = data.get('log_level', 'info')
 
+        # Optional cap on feeds processed at the same time
+        max_workers = data.get('max_workers')
+        if max_workers is not None and (
+            not isinstance(max_workers, int) or isinstance(max_workers, bool) or max_workers < 1
+        ):
+            raise ConfigError(f"max_workers must be a positive integer: {max_workers}")
+
         # Parse feeds
         feeds_data = data.get('feeds', [])
         if not feeds_data:
@@ -110,7 +208,8 @@ class ConfigLoader:
         return AggregatorConfig(
             coves_api_url=coves_api_url,
             feeds=feeds,
-            log_level=log_level
+            log_level=log_level,
+            max_workers=max_workers
         )
 
     def _parse_feed(self, data: Dict[str, Any]) -> FeedConfig:
@@ -156,10 +255,10 @@ class ConfigLoader:
             url: URL to validate
 
         Returns:
-            True if valid, False otherwise
+            True if valid (http(s) scheme and a host), False otherwise
         """
-        try:
-            result = urlparse(url)
-            return all([result.scheme, result.netloc])
-        except Exception:
+        if not isinstance(url, str):
             return False
+
+        match = _URL_RE.match(url)
+        return match is not None and match.group(1).lower() in _VALID_URL_SCHEMES
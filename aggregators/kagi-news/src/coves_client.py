@@ -3,12 +3,20 @@ Coves API Client for posting to communities.
 
 Handles API key authentication and posting via XRPC.
 """
+import functools
 import logging
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from datetime import datetime, timezone
 from typing import Dict, List, Optional
+from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
+# Lookup table: 1 for bytes allowed in the hex-encoded part of an API key
+_HEX_MASK = bytes(1 if chr(i) in '0123456789abcdefABCDEF' else 0 for i in range(256))
+
 
 class CovesAPIError(Exception):
     """Base exception for Coves API errors."""
@@ -53,6 +61,10 @@ class CovesClient:
     API_KEY_PREFIX = "ckapi_"
     API_KEY_TOTAL_LENGTH = 70  # 6 (prefix) + 64 (32 bytes hex-encoded)
 
+    # Connection pool sizing for the shared session
+    POOL_CONNECTIONS = 4
+    POOL_MAXSIZE = 32
+
     def __init__(self, api_url: str, api_key: str):
         """
         Initialize Coves client with API key authentication.
@@ -65,15 +77,7 @@ class CovesClient:
             ValueError: If api_key format is invalid
         """
         # Validate API key format for early failure with clear error
-        if not api_key:
-            raise ValueError("API key cannot be empty")
-        if not api_key.startswith(self.API_KEY_PREFIX):
-            raise ValueError(f"API key must start with '{self.API_KEY_PREFIX}'")
-        if len(api_key) != self.API_KEY_TOTAL_LENGTH:
-            raise ValueError(
-                f"API key must be {self.API_KEY_TOTAL_LENGTH} characters "
-                f"(got {len(api_key)})"
-            )
+        _validate_api_key(api_key)
 
         self.api_url = api_url.rstrip('/')
         self.api_key = api_key
@@ -81,6 +85,27 @@ class CovesClient:
         self.session.headers['Authorization'] = f'Bearer {api_key}'
         self.session.headers['Content-Type'] = 'application/json'
 
+        # Keep connections alive across posts. Only retry when the request
+        # can't have been processed (connect failures, 429): re-POSTing
+        # after a 5xx or read error could create a duplicate post.
+        retry = Retry(
+            total=3,
+            connect=3,
+            read=0,
+            status=3,
+            backoff_factor=0.3,
+            status_forcelist=[429],
+            allowed_methods=frozenset({'POST'}),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.POOL_CONNECTIONS,
+            pool_maxsize=self.POOL_MAXSIZE,
+            max_retries=retry
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
     def authenticate(self):
         """
         No-op for API key authentication.
@@ -143,7 +168,7 @@ class CovesClient:
 
             # Make HTTP request to XRPC endpoint using session with API key
             url = f"{self.api_url}/xrpc/social.coves.community.post.create"
-            response = self.session.post(url, json=post_data, timeout=30)
+            response = self.session.post(url, data=orjson.dumps(post_data), timeout=30)
 
             # Handle specific error cases
             if not response.ok:
@@ -152,7 +177,7 @@ class CovesClient:
                 self._raise_for_status(response)
 
             try:
-                result = response.json()
+                result = orjson.loads(response.content)
                 post_uri = result["uri"]
             except (ValueError, KeyError) as e:
                 # ValueError for invalid JSON, KeyError for missing 'uri' field
@@ -261,5 +286,39 @@ class CovesClient:
         Returns:
             ISO timestamp string
         """
-        from datetime import datetime, timezone
         return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+@functools.lru_cache(maxsize=16)
+def _validate_api_key(api_key: str) -> None:
+    """
+    Check an API key's format.
+
+    Only keys that pass are cached (a raised error isn't), so clients
+    reusing the same key skip the per-character hex scan.
+
+    Args:
+        api_key: Coves API key
+
+    Raises:
+        ValueError: If api_key format is invalid
+    """
+    if not api_key:
+        raise ValueError("API key cannot be empty")
+
+    prefix = CovesClient.API_KEY_PREFIX
+    total_length = CovesClient.API_KEY_TOTAL_LENGTH
+
+    # Non-ASCII characters become '?', which fails the prefix or hex check
+    raw = api_key.encode('ascii', 'replace')
+    if raw[:len(prefix)] != prefix.encode('ascii'):
+        raise ValueError(f"API key must start with '{prefix}'")
+    if len(raw) != total_length:
+        raise ValueError(
+            f"API key must be {total_length} characters "
+            f"(got {len(api_key)})"
+        )
+    if not all(_HEX_MASK[b] for b in raw[len(prefix):]):
+        raise ValueError(
+            f"API key must be hex-encoded after the '{prefix}' prefix"
+        )
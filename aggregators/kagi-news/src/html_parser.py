@@ -5,20 +5,105 @@ Parses the HTML content from RSS feed item descriptions
 into structured data.
 """
 import re
+import copy
+import html
+import hashlib
+import functools
+import threading
 import logging
+from collections import OrderedDict
 from typing import Dict, List, Optional
 from datetime import datetime
-from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
+from lxml.html import HtmlElement
 from urllib.parse import urlparse
 
 from src.models import KagiStory, Perspective, Quote, Source
 
 logger = logging.getLogger(__name__)
 
+# <h3> headings whose following <ul> holds a list section
+_SECTION_NAMES = ('Highlights', 'Perspectives', 'Sources')
+
+# Exact heading text Kagi emits -> section, so the usual <h3> is routed with
+# one dict probe; other headings fall back to a substring scan of the names
+_SECTION_DISPATCH = {f'{name}:': name for name in _SECTION_NAMES}
+
+# Compiled once at import rather than per call (the re module's own cache is
+# bounded and can be flushed)
+# "Actor: Description (Source)." -> ("Actor", "Description", "Source"); the
+# trailing parenthesised citation is optional and the actor may be empty
+_PERSPECTIVE_RE = re.compile(r'^([^:]*):\s*(.*?)(?:\s*\(([^()]*)\))?[\s.]*$', re.DOTALL)
+
+# Regex fast path for flat descriptions: whitespace, text-only <p> elements,
+# <img> and <br> tags. Groups: 1 = paragraph text, 2 = image attributes.
+_FLAT_TOKEN_RE = re.compile(
+    r'\s+'
+    r'|<p(?:\s[^>]*)?>([^<]*)</p\s*>'
+    r'|<img((?:\s+[^\s=/>]+(?:\s*=\s*(?:"[^"]*"|\'[^\']*\'|[^\s"\'>]+))?)*)\s*/?>'
+    r'|<br\s*/?>',
+    re.IGNORECASE
+)
+_ATTR_RE = re.compile(r'([^\s=/>]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+)))?')
+
+# First <a> inside a list item. A compiled XPath is evaluated directly,
+# without find()'s per-call ElementPath cache lookup.
+_FIRST_LINK_XPATH = etree.XPath('(.//a)[1]')
+
+
+def _section_for_heading(heading: str) -> Optional[str]:
+    """Get the list section an <h3> heading names, or None."""
+    section = _SECTION_DISPATCH.get(heading.strip())
+    if section is None:
+        section = next((name for name in _SECTION_NAMES if name in heading), None)
+    return section
+
+
+@functools.lru_cache(maxsize=2048)
+def _url_to_domain(url: str) -> str:
+    """
+    Get the domain of a source URL without its "www." prefix.
+
+    Memoized because stories in a feed keep citing the same articles.
+    """
+    if url.startswith(('https://', 'http://')) and url.isprintable():
+        # Plain http(s) URL: the netloc runs from "//" to the first of
+        # "/", "?" or "#", so slice it out without building a SplitResult
+        start = url.index('//') + 2
+        end = len(url)
+        for separator in '/?#':
+            index = url.find(separator, start, end)
+            if index != -1:
+                end = index
+        domain = url[start:end]
+    else:
+        # Anything unusual (other schemes, stray whitespace) gets urlparse's
+        # full handling
+        domain = urlparse(url).netloc
+
+    # Remove "www." prefix if present. A 4-character slice compare avoids
+    # the startswith() method call; a compiled port could compare the
+    # prefix as one 32-bit word instead.
+    if domain[:4] == 'www.':
+        domain = domain[4:]
+
+    return domain
+
 
 class KagiHTMLParser:
     """Parses Kagi News HTML descriptions into structured data."""
 
+    # Maximum number of parsed descriptions kept in memory
+    CACHE_SIZE = 512
+
+    def __init__(self):
+        """Initialize parser with an empty parse cache."""
+        # Keyed by a 16-byte digest of the description so the cache doesn't
+        # hold on to the (multi-KB) HTML strings themselves
+        self._cache: "OrderedDict[bytes, Dict]" = OrderedDict()
+        # Guards the cache when feeds are processed on several threads
+        self._cache_lock = threading.Lock()
+
     def parse(self, html_description: str) -> Dict:
         """
         Parse HTML description into structured data.
@@ -35,17 +120,177 @@ class KagiHTMLParser:
                 - quote: Optional[Dict[str, str]]
                 - perspectives: List[Dict]
                 - sources: List[Dict]
+
+        Results are cached by content, so re-polling an unchanged item
+        skips HTML parsing. Each call returns its own copy.
+        """
+        fields = self._parse_fields(html_description)
+
+        # Dicts are built field by field: the models are flat, so asdict()'s
+        # recursive deep copy would only add overhead (~30x per object)
+        quote = fields['quote']
+        return {
+            'summary': fields['summary'],
+            'image_url': fields['image_url'],
+            'image_alt': fields['image_alt'],
+            'highlights': list(fields['highlights']),
+            'quote': {
+                'text': quote.text,
+                'attribution': quote.attribution,
+            } if quote else None,
+            'perspectives': [
+                {
+                    'actor': p.actor,
+                    'description': p.description,
+                    'source_url': p.source_url,
+                    'source_name': p.source_name,
+                }
+                for p in fields['perspectives']
+            ],
+            'sources': [
+                {'title': s.title, 'url': s.url, 'domain': s.domain}
+                for s in fields['sources']
+            ],
+        }
+
+    def _parse_fields(self, html_description: str) -> Dict:
+        """
+        Parse HTML description into model objects, using the parse cache.
+
+        Same keys as parse(), but quote/perspectives/sources hold Quote,
+        Perspective and Source objects. The returned dict is the cached
+        entry itself and must not be mutated.
+        """
+        key = hashlib.blake2b(html_description.encode('utf-8'), digest_size=16).digest()
+
+        with self._cache_lock:
+            parsed = self._cache.get(key)
+            if parsed is not None:
+                self._cache.move_to_end(key)
+                return parsed
+
+        parsed = self._parse_html(html_description)
+        with self._cache_lock:
+            self._cache[key] = parsed
+            if len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+        return parsed
+
+    def _parse_html(self, html_description: str) -> Dict:
+        """Parse HTML description without consulting the cache."""
+        parsed = self._parse_flat(html_description)
+        if parsed is None:
+            parsed = self._parse_tree(html_description)
+        return parsed
+
+    def _parse_flat(self, html_description: str) -> Optional[Dict]:
         """
-        soup = BeautifulSoup(html_description, 'html.parser')
+        Parse a summary/image-only description with regexes.
+
+        Returns None (so the caller builds a full tree) unless the HTML is
+        nothing but whitespace, text-only <p> elements, <img> and <br> tags.
+        """
+        summary = None
+        img_attrs = None
+
+        pos = 0
+        end = len(html_description)
+        while pos < end:
+            token = _FLAT_TOKEN_RE.match(html_description, pos)
+            if not token:
+                return None
+            if token.group(1) is not None:
+                if summary is None:
+                    summary = html.unescape(token.group(1)).strip()
+            elif token.group(2) is not None:
+                if img_attrs is None:
+                    img_attrs = token.group(2)
+            pos = token.end()
+
+        image_url = None
+        image_alt = None
+        if img_attrs:
+            attrs = {}
+            for attr in _ATTR_RE.finditer(img_attrs):
+                name = attr.group(1).lower()
+                if name not in attrs:
+                    value = attr.group(2) or attr.group(3) or attr.group(4) or ''
+                    attrs[name] = html.unescape(value)
+            image_url = attrs.get('src') or None
+            image_alt = attrs.get('alt') or None
+
+        return {
+            'summary': summary or "",
+            'image_url': image_url,
+            'image_alt': image_alt,
+            'highlights': [],
+            'quote': None,
+            'perspectives': [],
+            'sources': [],
+        }
+
+    def _parse_tree(self, html_description: str) -> Dict:
+        """Parse HTML description by walking an lxml element tree."""
+        # libxml2 builds the tree (and decodes entities) in C; the fragment
+        # is wrapped in a <div> so its top-level elements are the children
+        root = lxml_html.fragment_fromstring(html_description, create_parent='div')
+
+        # Walk the top-level elements once, remembering the first <p>, <img>
+        # and <blockquote>, and routing each <ul> to the section named by the
+        # <h3> heading that precedes it. Comments have a non-string tag and
+        # match nothing.
+        p_tag = None
+        img_tag = None
+        blockquote = None
+        sections: Dict[str, HtmlElement] = {}
+        pending_section = None
+
+        for node in root:
+            name = node.tag
+            if name == 'p':
+                if p_tag is None:
+                    p_tag = node
+            elif name == 'img':
+                if img_tag is None:
+                    img_tag = node
+            elif name == 'blockquote':
+                if blockquote is None:
+                    blockquote = node
+            elif name == 'h3':
+                section = _section_for_heading(node.text_content())
+                if section is not None:
+                    pending_section = section
+            elif name == 'ul' and pending_section:
+                sections.setdefault(pending_section, node)
+                pending_section = None
+
+        # Descriptions wrapped in a <div>, table or <p> have nothing useful at
+        # the top level; search the whole tree for whatever the walk missed
+        if p_tag is None:
+            p_tag = next(root.iter('p'), None)
+        if img_tag is None:
+            img_tag = next(root.iter('img'), None)
+        if blockquote is None:
+            blockquote = next(root.iter('blockquote'), None)
+        if not sections:
+            for h3 in root.iter('h3'):
+                section = _section_for_heading(h3.text_content())
+                if section is None or section in sections:
+                    continue
+                # Nearest following <ul> sibling, like the top-level walk
+                ul = next(h3.itersiblings('ul'), None)
+                if ul is not None:
+                    sections[section] = ul
 
         return {
-            'summary': self._extract_summary(soup),
-            'image_url': self._extract_image_url(soup),
-            'image_alt': self._extract_image_alt(soup),
-            'highlights': self._extract_highlights(soup),
-            'quote': self._extract_quote(soup),
-            'perspectives': self._extract_perspectives(soup),
-            'sources': self._extract_sources(soup),
+            'summary': self._extract_summary(p_tag),
+            'image_url': self._extract_image_url(img_tag),
+            'image_alt': self._extract_image_alt(img_tag),
+            'highlights': self._extract_highlights(sections.get('Highlights')),
+            'quote': self._extract_quote(blockquote, sections.get('Perspectives')),
+            'perspectives': self._extract_perspectives(sections.get('Perspectives')),
+            'sources': self._extract_sources(sections.get('Sources')),
         }
 
     def parse_to_story(
@@ -70,35 +315,13 @@ class KagiHTMLParser:
 
         Returns:
             KagiStory object
+
+        The description's fields come from the parse cache; the story gets
+        its own copies of them (the models are flat, so shallow copies are
+        enough) and the caller's other arguments as given.
         """
-        parsed = self.parse(html_description)
-
-        # Convert parsed data to model objects
-        perspectives = [
-            Perspective(
-                actor=p['actor'],
-                description=p['description'],
-                source_url=p['source_url'],
-                source_name=p.get('source_name', '')
-            )
-            for p in parsed['perspectives']
-        ]
-
-        sources = [
-            Source(
-                title=s['title'],
-                url=s['url'],
-                domain=s['domain']
-            )
-            for s in parsed['sources']
-        ]
-
-        quote = None
-        if parsed['quote']:
-            quote = Quote(
-                text=parsed['quote']['text'],
-                attribution=parsed['quote']['attribution']
-            )
+        parsed = self._parse_fields(html_description)
+        quote = parsed['quote']
 
         return KagiStory(
             title=title,
@@ -107,197 +330,151 @@ class KagiHTMLParser:
             pub_date=pub_date,
             categories=categories,
             summary=parsed['summary'],
-            highlights=parsed['highlights'],
-            perspectives=perspectives,
-            quote=quote,
-            sources=sources,
+            highlights=list(parsed['highlights']),
+            perspectives=[copy.copy(p) for p in parsed['perspectives']],
+            quote=copy.copy(quote) if quote else None,
+            sources=[copy.copy(s) for s in parsed['sources']],
             image_url=parsed['image_url'],
             image_alt=parsed['image_alt']
         )
 
-    def _extract_summary(self, soup: BeautifulSoup) -> str:
+    def _extract_summary(self, p_tag: Optional[HtmlElement]) -> str:
         """Extract summary from first <p> tag."""
-        p_tag = soup.find('p')
-        if p_tag:
-            return p_tag.get_text(strip=True)
+        if p_tag is not None:
+            return p_tag.text_content().strip()
         return ""
 
-    def _extract_image_url(self, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_image_url(self, img_tag: Optional[HtmlElement]) -> Optional[str]:
         """Extract image URL from <img> tag."""
-        img_tag = soup.find('img')
-        if img_tag and img_tag.get('src'):
-            return img_tag['src']
+        if img_tag is not None:
+            return img_tag.get('src') or None
         return None
 
-    def _extract_image_alt(self, soup: BeautifulSoup) -> Optional[str]:
+    def _extract_image_alt(self, img_tag: Optional[HtmlElement]) -> Optional[str]:
         """Extract image alt text from <img> tag."""
-        img_tag = soup.find('img')
-        if img_tag and img_tag.get('alt'):
-            return img_tag['alt']
+        if img_tag is not None:
+            return img_tag.get('alt') or None
         return None
 
-    def _extract_highlights(self, soup: BeautifulSoup) -> List[str]:
-        """Extract highlights list from H3 section."""
-        highlights = []
-
-        # Find "Highlights:" h3 tag
-        h3_tags = soup.find_all('h3')
-        for h3 in h3_tags:
-            if 'Highlights' in h3.get_text():
-                # Get the <ul> that follows this h3
-                ul = h3.find_next_sibling('ul')
-                if ul:
-                    for li in ul.find_all('li'):
-                        highlights.append(li.get_text(strip=True))
-                break
+    def _extract_highlights(self, ul: Optional[HtmlElement]) -> List[str]:
+        """Extract highlights list from the <ul> under the Highlights heading."""
+        if ul is None:
+            return []
+        return [li.text_content().strip() for li in ul.iter('li')]
 
-        return highlights
-
-    def _extract_quote(self, soup: BeautifulSoup) -> Optional[Dict[str, str]]:
+    def _extract_quote(
+        self,
+        blockquote: Optional[HtmlElement],
+        perspectives_ul: Optional[HtmlElement]
+    ) -> Optional[Quote]:
         """Extract quote from <blockquote> tag."""
-        blockquote = soup.find('blockquote')
-        if not blockquote:
+        if blockquote is None:
             return None
 
-        text = blockquote.get_text(strip=True)
+        text = blockquote.text_content().strip()
 
-        # Try to split on " - " to separate quote from attribution
-        if ' - ' in text:
-            quote_text, attribution = text.rsplit(' - ', 1)
-            return {
-                'text': quote_text.strip(),
-                'attribution': attribution.strip()
-            }
+        # Try to split on the last " - " to separate quote from attribution
+        quote_text, separator, attribution = text.rpartition(' - ')
+        if separator:
+            return Quote(text=quote_text.strip(), attribution=attribution.strip())
 
         # If no attribution found, entire text is the quote
         # Try to infer attribution from context (often mentioned in highlights/perspectives)
-        return {
-            'text': text,
-            'attribution': self._infer_quote_attribution(soup, text)
-        }
+        return Quote(
+            text=text,
+            attribution=self._infer_quote_attribution(perspectives_ul, text)
+        )
 
-    def _infer_quote_attribution(self, soup: BeautifulSoup, quote_text: str) -> str:
+    def _infer_quote_attribution(self, perspectives_ul: Optional[HtmlElement], quote_text: str) -> str:
         """
         Try to infer quote attribution from context.
 
         This is a fallback when quote doesn't have explicit attribution.
+        Uses the Perspectives <ul> already located by the section walk.
         """
         # For now, check if any perspective mentions similar keywords
-        perspectives_section = soup.find('h3', string=re.compile(r'Perspectives'))
-        if perspectives_section:
-            ul = perspectives_section.find_next_sibling('ul')
-            if ul:
-                for li in ul.find_all('li'):
-                    li_text = li.get_text()
-                    # Extract actor name (before first colon)
-                    if ':' in li_text:
-                        actor = li_text.split(':', 1)[0].strip()
-                        return actor
+        if perspectives_ul is not None:
+            for li in perspectives_ul.iter('li'):
+                # Extract actor name (before first colon)
+                actor, separator, _ = li.text_content().partition(':')
+                if separator:
+                    return actor.strip()
 
         return "Unknown"
 
-    def _extract_perspectives(self, soup: BeautifulSoup) -> List[Dict]:
-        """Extract perspectives from H3 section."""
+    def _extract_perspectives(self, ul: Optional[HtmlElement]) -> List[Perspective]:
+        """Extract perspectives from the <ul> under the Perspectives heading."""
         perspectives = []
-
-        # Find "Perspectives:" h3 tag
-        h3_tags = soup.find_all('h3')
-        for h3 in h3_tags:
-            if 'Perspectives' in h3.get_text():
-                # Get the <ul> that follows this h3
-                ul = h3.find_next_sibling('ul')
-                if ul:
-                    for li in ul.find_all('li'):
-                        perspective = self._parse_perspective_li(li)
-                        if perspective:
-                            perspectives.append(perspective)
-                break
-
+        if ul is not None:
+            for li in ul.iter('li'):
+                perspective = self._parse_perspective_li(li)
+                if perspective:
+                    perspectives.append(perspective)
         return perspectives
 
-    def _parse_perspective_li(self, li) -> Optional[Dict]:
+    def _parse_perspective_li(self, li) -> Optional[Perspective]:
         """
         Parse a single perspective <li> element.
 
         Format: "Actor: Description. (Source)"
         """
-        # Get full text
-        full_text = li.get_text()
-
-        # Extract actor (before first colon)
-        if ':' not in full_text:
+        # Split actor (before first colon), description and citation in one match
+        text = li.text_content()
+        match = _PERSPECTIVE_RE.match(text)
+        if not match:
             return None
 
-        actor, rest = full_text.split(':', 1)
-        actor = actor.strip()
-
-        # Find the <a> tag for source URL and name
-        a_tag = li.find('a')
-        source_url = a_tag['href'] if a_tag and a_tag.get('href') else ""
-        source_name = a_tag.get_text(strip=True) if a_tag else ""
-
-        # Extract description (between colon and source link)
-        # Remove the source citation part in parentheses
-        description = rest
-
-        # Remove source citation like "(The Straits Times)" from description
-        if a_tag:
-            # Remove the link text and surrounding parentheses
-            link_text = a_tag.get_text()
-            description = description.replace(f"({link_text})", "").strip()
+        actor = match.group(1).strip()
+
+        # Find the <a> tag for source URL and name (its text is read once)
+        links = _FIRST_LINK_XPATH(li)
+        a_tag = links[0] if links else None
+        source_url = ""
+        source_name = ""
+        if a_tag is not None:
+            source_url = a_tag.get('href') or ""
+            source_name = a_tag.text_content().strip()
+
+        # Drop the source citation like "(The Straits Times)" from the end of
+        # the description only when it matches the link text
+        citation = match.group(3)
+        if a_tag is not None and citation is not None and citation.strip() == source_name:
+            description = match.group(2)
+        else:
+            description = text[match.start(2):]
 
         # Clean up trailing period
         description = description.strip('. ')
 
-        return {
-            'actor': actor,
-            'description': description,
-            'source_url': source_url,
-            'source_name': source_name
-        }
+        return Perspective(
+            actor=actor,
+            description=description,
+            source_url=source_url,
+            source_name=source_name
+        )
 
-    def _extract_sources(self, soup: BeautifulSoup) -> List[Dict]:
-        """Extract sources list from H3 section."""
+    def _extract_sources(self, ul: Optional[HtmlElement]) -> List[Source]:
+        """Extract sources list from the <ul> under the Sources heading."""
         sources = []
-
-        # Find "Sources:" h3 tag
-        h3_tags = soup.find_all('h3')
-        for h3 in h3_tags:
-            if 'Sources' in h3.get_text():
-                # Get the <ul> that follows this h3
-                ul = h3.find_next_sibling('ul')
-                if ul:
-                    for li in ul.find_all('li'):
-                        source = self._parse_source_li(li)
-                        if source:
-                            sources.append(source)
-                break
-
+        if ul is not None:
+            for li in ul.iter('li'):
+                source = self._parse_source_li(li)
+                if source:
+                    sources.append(source)
         return sources
 
-    def _parse_source_li(self, li) -> Optional[Dict]:
+    def _parse_source_li(self, li) -> Optional[Source]:
         """
         Parse a single source <li> element.
 
         Format: "<a href='...'>Title</a> - domain.com"
         """
-        a_tag = li.find('a')
-        if not a_tag or not a_tag.get('href'):
+        links = _FIRST_LINK_XPATH(li)
+        a_tag = links[0] if links else None
+        url = a_tag.get('href') if a_tag is not None else None
+        if not url:
             return None
 
-        title = a_tag.get_text(strip=True)
-        url = a_tag['href']
-
-        # Extract domain from URL
-        parsed_url = urlparse(url)
-        domain = parsed_url.netloc
-
-        # Remove "www." prefix if present
-        if domain.startswith('www.'):
-            domain = domain[4:]
+        title = a_tag.text_content().strip()
 
-        return {
-            'title': title,
-            'url': url,
-            'domain': domain
-        }
+        return Source(title=title, url=url, domain=_url_to_domain(url))
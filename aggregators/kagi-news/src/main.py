@@ -14,9 +14,11 @@ Designed to run via CRON (single execution, then exit).
 import os
 import sys
 import logging
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
 from src.config import ConfigLoader
 from src.rss_fetcher import RSSFetcher
@@ -24,6 +26,7 @@ from src.html_parser import KagiHTMLParser
 from src.richtext_formatter import RichTextFormatter
 from src.state_manager import StateManager
 from src.coves_client import CovesClient
+from src.models import KagiStory
 
 # Setup logging
 logging.basicConfig(
@@ -40,6 +43,13 @@ class Aggregator:
     Coordinates all components to fetch, parse, format, and post stories.
     """
 
+    # Default maximum number of feeds fetched (and then processed) at the
+    # same time; config.yaml's max_workers overrides it
+    MAX_CONCURRENT_FEEDS = 8
+
+    # Maximum number of create_post requests in flight, across all feeds
+    MAX_CONCURRENT_POSTS = 8
+
     def __init__(
         self,
         config_path: Path,
@@ -58,10 +68,12 @@ class Aggregator:
         logger.info("Loading configuration...")
         config_loader = ConfigLoader(config_path)
         self.config = config_loader.load()
+        self.max_concurrent_feeds = self.config.max_workers or self.MAX_CONCURRENT_FEEDS
 
         # Initialize components
         logger.info("Initializing components...")
-        self.rss_fetcher = RSSFetcher()
+        # One kept-alive connection per concurrent fetch (Kagi feeds share a host)
+        self.rss_fetcher = RSSFetcher(pool_maxsize=self.max_concurrent_feeds)
         self.html_parser = KagiHTMLParser()
         self.richtext_formatter = RichTextFormatter()
         self.state_manager = StateManager(state_file)
@@ -106,34 +118,110 @@ class Aggregator:
             logger.error("Cannot continue without authentication")
             return
 
-        # Process each feed
-        for feed_config in enabled_feeds:
-            try:
-                self._process_feed(feed_config)
-            except Exception as e:
-                # Log error but continue with other feeds
-                logger.error(f"Error processing feed '{feed_config.name}': {e}", exc_info=True)
-                continue
+        # One timestamp for the whole run, recorded as every feed's last run
+        run_started_at = datetime.now()
+
+        # Fetch all feeds up front so their network round-trips overlap
+        feeds = self._fetch_all_feeds(enabled_feeds)
+
+        # Process feeds concurrently; StateManager serializes state updates.
+        # Every feed posts through one shared pool, so the number of open
+        # connections to the AppView stays bounded however many feeds run.
+        if enabled_feeds:
+            max_workers = min(self.max_concurrent_feeds, len(enabled_feeds))
+            with ThreadPoolExecutor(max_workers=self.MAX_CONCURRENT_POSTS) as post_executor, \
+                    ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(
+                        self._process_feed,
+                        feed_config,
+                        feeds.get(feed_config.url),
+                        run_started_at,
+                        post_executor
+                    ): feed_config
+                    for feed_config in enabled_feeds
+                }
+                for future in as_completed(futures):
+                    feed_config = futures[future]
+                    try:
+                        future.result()
+                    except Exception as e:
+                        # Log error but continue with other feeds
+                        logger.error(f"Error processing feed '{feed_config.name}': {e}", exc_info=True)
 
         logger.info("=" * 60)
         logger.info("Aggregator run completed")
         logger.info("=" * 60)
 
-    def _process_feed(self, feed_config):
+    def _fetch_all_feeds(self, feed_configs: List) -> Dict[str, Any]:
+        """
+        Fetch RSS feeds concurrently.
+
+        Args:
+            feed_configs: FeedConfig objects to fetch
+
+        Feeds are fetched conditionally using the validators and body hash
+        saved from their last full fetch.
+
+        Returns:
+            Dict mapping each feed URL to its parsed feed, None if it
+            hasn't changed, or the exception raised while fetching it
+        """
+        urls = list(dict.fromkeys(feed_config.url for feed_config in feed_configs))
+        results: Dict[str, Any] = {}
+        if not urls:
+            return results
+
+        max_workers = min(self.max_concurrent_feeds, len(urls))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for url in urls:
+                etag, modified = self.state_manager.get_feed_validators(url)
+                futures[url] = executor.submit(
+                    self.rss_fetcher.fetch_feed,
+                    url,
+                    etag=etag,
+                    modified=modified,
+                    content_hash=self.state_manager.get_feed_content_hash(url)
+                )
+            for url, future in futures.items():
+                try:
+                    results[url] = future.result()
+                except Exception as e:
+                    results[url] = e
+
+        return results
+
+    def _process_feed(
+        self,
+        feed_config,
+        feed: Any,
+        run_started_at: datetime,
+        post_executor: Executor
+    ):
         """
         Process a single RSS feed.
 
         Args:
             feed_config: FeedConfig object
+            feed: Feed fetched by run(), None if it hasn't changed since
+                the last fetch, or the exception raised fetching it
+            run_started_at: Start of the current run, saved as the feed's
+                last run time
+            post_executor: Pool shared by all feeds that sends create_post
+                requests
         """
         logger.info(f"Processing feed: {feed_config.name} -> {feed_config.community_handle}")
 
-        # Fetch RSS feed
-        try:
-            feed = self.rss_fetcher.fetch_feed(feed_config.url)
-        except Exception as e:
-            logger.error(f"Failed to fetch feed '{feed_config.name}': {e}")
-            raise
+        if isinstance(feed, Exception):
+            logger.error(f"Failed to fetch feed '{feed_config.name}': {feed}")
+            raise feed
+
+        if feed is None:
+            # 304 Not Modified: nothing new to post
+            self.state_manager.update_last_run(feed_config.url, run_started_at)
+            logger.info(f"Feed '{feed_config.name}': not modified, 0 new posts")
+            return
 
         # Check for feed errors
         if feed.bozo:
@@ -142,76 +230,175 @@ class Aggregator:
         # Process entries
         new_posts = 0
         skipped_posts = 0
-
+        failed_entries = 0
+        invalid_entries = 0
+
+        # Drop already-posted entries up front so only new ones are parsed.
+        # The snapshot also absorbs GUIDs queued below (feeds may repeat
+        # entries), so one set lookup covers both cases.
+        unseen = []  # (entry, guid) not posted yet
+        seen = self.state_manager.posted_guids(feed_config.url)
         for entry in feed.entries:
-            try:
-                # Check if already posted
-                guid = entry.guid if hasattr(entry, 'guid') else entry.link
-                if self.state_manager.is_posted(feed_config.url, guid):
-                    skipped_posts += 1
-                    logger.debug(f"Skipping already-posted story: {guid}")
-                    continue
-
-                # Parse story
-                story = self.html_parser.parse_to_story(
-                    title=entry.title,
-                    link=entry.link,
-                    guid=guid,
-                    pub_date=entry.published_parsed,
-                    categories=[tag.term for tag in entry.tags] if hasattr(entry, 'tags') else [],
-                    html_description=entry.description
-                )
+            # Entries without a title or link can never become a story; skip
+            # them with a plain check rather than letting the parser raise.
+            # They don't count as failures, so they can't block validators.
+            if not getattr(entry, 'title', None) or not getattr(entry, 'link', None):
+                invalid_entries += 1
+                logger.warning(f"Skipping entry without title or link in feed '{feed_config.name}'")
+                continue
 
-                # Format as rich text
-                rich_text = self.richtext_formatter.format_full(story)
+            try:
+                guid = self._canonical_guid(entry)
+            except Exception as e:
+                failed_entries += 1
+                logger.error(f"Error processing entry: {e}", exc_info=True)
+                continue
 
-                # Create external embed with sources
-                sources = [
-                    {"uri": s.url, "title": s.title, "domain": s.domain}
-                    for s in story.sources
-                ] if story.sources else None
+            if guid in seen:
+                skipped_posts += 1
+                logger.debug(f"Skipping already-posted story: {guid}")
+                continue
 
-                embed = self.coves_client.create_external_embed(
-                    uri=story.link,
-                    title=story.title,
-                    description=story.summary[:200] if len(story.summary) > 200 else story.summary,
-                    sources=sources
-                )
+            seen.add(guid)
+            unseen.append((entry, guid))
 
-                # Post to community
-                # Pass thumbnail URL from RSS feed at top level for trusted aggregator upload
+        # Parse each new entry and hand its post straight to the pool, so
+        # parsing the next story overlaps with posting the previous ones.
+        # Results are still handled in feed order; successful posts are
+        # buffered and saved together below.
+        try:
+            futures = []  # (guid, story, create_post future)
+            for entry, guid in unseen:
                 try:
-                    post_uri = self.coves_client.create_post(
-                        community_handle=feed_config.community_handle,
-                        title=story.title,
-                        content=rich_text["content"],
-                        facets=rich_text["facets"],
-                        embed=embed,
-                        thumbnail_url=story.image_url  # From RSS feed - server will validate and upload
-                    )
-
-                    # Mark as posted (only if successful)
-                    self.state_manager.mark_posted(feed_config.url, guid, post_uri)
-                    new_posts += 1
-                    logger.info(f"Posted: {story.title[:50]}... -> {post_uri}")
+                    story, post_kwargs = self._prepare_post(feed_config, entry, guid)
+                except Exception as e:
+                    # Log error but continue with other entries
+                    failed_entries += 1
+                    logger.error(f"Error processing entry: {e}", exc_info=True)
+                    continue
+                future = post_executor.submit(self.coves_client.create_post, **post_kwargs)
+                futures.append((guid, story, future))
 
+            for guid, story, future in futures:
+                try:
+                    post_uri = future.result()
                 except Exception as e:
                     # Don't update state if posting failed
+                    failed_entries += 1
                     logger.error(f"Failed to post story '{story.title}': {e}")
                     continue
 
-            except Exception as e:
-                # Log error but continue with other entries
-                logger.error(f"Error processing entry: {e}", exc_info=True)
-                continue
+                # Mark as posted (only if successful)
+                self.state_manager.mark_posted_buffered(feed_config.url, guid, post_uri)
+                new_posts += 1
+                logger.info(f"Posted: {story.title[:50]}... -> {post_uri}")
+        except BaseException:
+            # Persist whatever was posted, even if something above failed.
+            # On success the update_last_run() save below writes the buffered
+            # marks together with the validators, one state write per feed.
+            self.state_manager.flush()
+            raise
 
-        # Update last run timestamp
-        self.state_manager.update_last_run(feed_config.url, datetime.now())
+        # Remember validators for a conditional fetch next run, but only once
+        # every entry made it: a 304 would otherwise hide failed posts from
+        # the retry on the next run
+        if not failed_entries:
+            self.state_manager.update_feed_validators(
+                feed_config.url,
+                getattr(feed, 'etag', None),
+                getattr(feed, 'modified', None),
+                getattr(feed, 'content_hash', None)
+            )
+
+        # Update last run timestamp (also saves the marks and validators)
+        self.state_manager.update_last_run(feed_config.url, run_started_at)
 
         logger.info(
             f"Feed '{feed_config.name}': {new_posts} new posts, {skipped_posts} duplicates"
+            + (f", {invalid_entries} invalid" if invalid_entries else "")
+        )
+
+    def _prepare_post(self, feed_config, entry, guid: str) -> Tuple[KagiStory, Dict[str, Any]]:
+        """
+        Parse and format a feed entry into create_post arguments.
+
+        Args:
+            feed_config: FeedConfig object
+            entry: Feed entry
+            guid: Entry's deduplication key
+
+        Returns:
+            Tuple of (story, create_post keyword arguments)
+        """
+        # Parse story
+        story = self.html_parser.parse_to_story(
+            title=entry.title,
+            link=entry.link,
+            guid=guid,
+            pub_date=entry.published_parsed,
+            categories=self._entry_categories(entry),
+            html_description=entry.description
         )
 
+        # Format as rich text
+        rich_text = self.richtext_formatter.format_full(story)
+
+        # Create external embed with sources
+        sources = [
+            {"uri": s.url, "title": s.title, "domain": s.domain}
+            for s in story.sources
+        ] if story.sources else None
+
+        embed = self.coves_client.create_external_embed(
+            uri=story.link,
+            title=story.title,
+            description=story.summary[:200],  # Slicing is safe on shorter summaries
+            sources=sources
+        )
+
+        # Pass thumbnail URL from RSS feed at top level for trusted aggregator upload
+        return story, {
+            "community_handle": feed_config.community_handle,
+            "title": story.title,
+            "content": rich_text["content"],
+            "facets": rich_text["facets"],
+            "embed": embed,
+            "thumbnail_url": story.image_url  # From RSS feed - server will validate and upload
+        }
+
+    @staticmethod
+    def _entry_categories(entry) -> List[str]:
+        """Get an entry's category terms (one attribute lookup, no hasattr probe)."""
+        return [tag.term for tag in getattr(entry, 'tags', None) or ()]
+
+    @staticmethod
+    def _canonical_guid(entry) -> str:
+        """
+        Get the deduplication key for a feed entry.
+
+        Uses the entry's GUID when it has one. Otherwise falls back to its
+        link with tracking parameters (utm_*, fbclid) removed, so the same
+        story linked with different tracking tags is only posted once.
+        """
+        guid = getattr(entry, 'guid', None)
+        if guid:
+            return guid
+
+        link = entry.link
+        parts = urlsplit(link)
+        if not parts.query:
+            return link
+
+        params = parse_qsl(parts.query, keep_blank_values=True)
+        query = [
+            (key, value) for key, value in params
+            if not key.startswith('utm_') and key != 'fbclid'
+        ]
+        if len(query) == len(params):
+            # Nothing to strip: keep the link byte-for-byte (existing state)
+            return link
+        return urlunsplit(parts._replace(query=urlencode(query)))
+
 
 def main():
     """
@@ -6,7 +6,7 @@ from datetime import datetime
 from typing import List, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Source:
     """A news source citation."""
     title: str
@@ -14,7 +14,7 @@ class Source:
     domain: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Perspective:
     """A perspective from a particular actor/stakeholder."""
     actor: str
@@ -23,14 +23,14 @@ class Perspective:
     source_name: str = ""  # Name of the source (e.g., "The Straits Times")
 
 
-@dataclass
+@dataclass(slots=True)
 class Quote:
     """A notable quote from the story."""
     text: str
     attribution: str
 
 
-@dataclass
+@dataclass(slots=True)
 class KagiStory:
     """
     Structured representation of a Kagi News story.
@@ -63,7 +63,7 @@ class KagiStory:
             raise ValueError("guid is required")
 
 
-@dataclass
+@dataclass(slots=True)
 class FeedConfig:
     """Configuration for a single RSS feed."""
     name: str
@@ -72,9 +72,10 @@ class FeedConfig:
     enabled: bool = True
 
 
-@dataclass
+@dataclass(slots=True)
 class AggregatorConfig:
     """Full aggregator configuration."""
     coves_api_url: str
     feeds: List[FeedConfig]
     log_level: str = "info"
+    max_workers: Optional[int] = None  # Concurrent feeds; None uses the default
@@ -5,12 +5,25 @@ Converts KagiStory objects to Coves rich text format with facets.
 Handles UTF-8 byte position calculation for multi-byte characters.
 """
 import logging
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from src.models import KagiStory, Perspective, Source
 
 logger = logging.getLogger(__name__)
 
 
+def _precoded(text: str) -> Tuple[str, int]:
+    """Pair a fixed string with its UTF-8 byte length."""
+    return text, len(text.encode('utf-8'))
+
+
+# Fixed strings used by format_full, measured once at import
+_HIGHLIGHTS_HEADER = _precoded("Highlights:")
+_PERSPECTIVES_HEADER = _precoded("Perspectives:")
+_SOURCES_HEADER = _precoded("Sources:")
+_BULLET = _precoded("• ")
+_ATTRIBUTION = _precoded("---\n📰 Story aggregated by ")
+
+
 class RichTextFormatter:
     """
     Formats KagiStory into Coves rich text with facets.
@@ -39,15 +52,16 @@ class RichTextFormatter:
 
         # Highlights (if present)
         if story.highlights:
-            builder.add_bold("Highlights:")
+            builder.add_bold(*_HIGHLIGHTS_HEADER)
             builder.add_text("\n")
             for highlight in story.highlights:
-                builder.add_text(f"• {highlight}\n\n")
+                builder.add_text(*_BULLET)
+                builder.add_text(f"{highlight}\n\n")
             builder.add_text("\n")
 
         # Perspectives (if present)
         if story.perspectives:
-            builder.add_bold("Perspectives:")
+            builder.add_bold(*_PERSPECTIVES_HEADER)
             builder.add_text("\n")
             for perspective in story.perspectives:
                 # Bold the actor name
@@ -73,16 +87,16 @@ class RichTextFormatter:
 
         # Sources (if present)
         if story.sources:
-            builder.add_bold("Sources:")
+            builder.add_bold(*_SOURCES_HEADER)
             builder.add_text("\n")
             for source in story.sources:
-                builder.add_text("• ")
+                builder.add_text(*_BULLET)
                 builder.add_link(source.title, source.url)
                 builder.add_text(f" - {source.domain}\n\n")
             builder.add_text("\n")
 
         # Kagi News attribution
-        builder.add_text("---\n📰 Story aggregated by ")
+        builder.add_text(*_ATTRIBUTION)
         builder.add_link("Kagi News", story.link)
 
         return builder.build()
@@ -93,21 +107,31 @@ class RichTextBuilder:
     Helper class to build rich text content with facets.
 
     Handles UTF-8 byte position tracking automatically.
+
+    The builder is append-only, so facets are recorded in increasing
+    byteStart order and need no sorting.
     """
 
     def __init__(self):
         self.content_parts = []
         self.facets = []
+        # UTF-8 length of the content so far, updated as parts are added
+        self._byte_pos = 0
 
-    def add_text(self, text: str):
-        """Add plain text without any facets."""
-        self.content_parts.append(text)
+    def add_text(self, text: str, byte_length: Optional[int] = None):
+        """
+        Add plain text without any facets.
 
-    def add_bold(self, text: str):
+        byte_length (here and in add_bold) is the text's UTF-8 length when
+        already known, e.g. for fixed strings measured once at import.
+        """
+        self._append(text, byte_length)
+
+    def add_bold(self, text: str, byte_length: Optional[int] = None):
         """Add text with bold facet."""
-        start_byte = self._get_current_byte_position()
-        self.content_parts.append(text)
-        end_byte = self._get_current_byte_position()
+        start_byte = self._byte_pos
+        self._append(text, byte_length)
+        end_byte = self._byte_pos
 
         self.facets.append({
             "index": {
@@ -121,9 +145,9 @@ class RichTextBuilder:
 
     def add_italic(self, text: str):
         """Add text with italic facet."""
-        start_byte = self._get_current_byte_position()
-        self.content_parts.append(text)
-        end_byte = self._get_current_byte_position()
+        start_byte = self._byte_pos
+        self._append(text)
+        end_byte = self._byte_pos
 
         self.facets.append({
             "index": {
@@ -137,9 +161,9 @@ class RichTextBuilder:
 
     def add_link(self, text: str, uri: str):
         """Add text with link facet."""
-        start_byte = self._get_current_byte_position()
-        self.content_parts.append(text)
-        end_byte = self._get_current_byte_position()
+        start_byte = self._byte_pos
+        self._append(text)
+        end_byte = self._byte_pos
 
         self.facets.append({
             "index": {
@@ -154,14 +178,19 @@ class RichTextBuilder:
             ]
         })
 
-    def _get_current_byte_position(self) -> int:
+    def _append(self, text: str, byte_length: Optional[int] = None):
         """
-        Get the current byte position in the content.
+        Append text and advance the byte position.
 
-        Uses UTF-8 encoding to handle multi-byte characters correctly.
+        Only the new text is measured, not the whole content built so far.
+        ASCII text (flagged by CPython, so isascii() is O(1)) is one byte
+        per character; anything else is encoded as UTF-8 so multi-byte
+        characters are counted correctly.
         """
-        current_content = ''.join(self.content_parts)
-        return len(current_content.encode('utf-8'))
+        self.content_parts.append(text)
+        if byte_length is None:
+            byte_length = len(text) if text.isascii() else len(text.encode('utf-8'))
+        self._byte_pos += byte_length
 
     def build(self) -> Dict:
         """
@@ -172,10 +201,8 @@ class RichTextBuilder:
         """
         content = ''.join(self.content_parts)
 
-        # Sort facets by start position for consistency
-        sorted_facets = sorted(self.facets, key=lambda f: f['index']['byteStart'])
-
+        # Facets are already ordered by start position (append-only builder)
         return {
             "content": content,
-            "facets": sorted_facets
+            "facets": self.facets
         }
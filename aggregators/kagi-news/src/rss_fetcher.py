@@ -2,9 +2,11 @@
 RSS feed fetcher with retry logic and error handling.
 """
 import time
+import hashlib
 import logging
 import requests
 import feedparser
+from requests.adapters import HTTPAdapter
 from typing import Optional
 
 logger = logging.getLogger(__name__)
@@ -13,26 +15,66 @@ logger = logging.getLogger(__name__)
 class RSSFetcher:
     """Fetches RSS feeds with retry logic."""
 
-    def __init__(self, timeout: int = 30, max_retries: int = 3):
+    # Default connections kept alive per host (feeds are fetched concurrently)
+    POOL_MAXSIZE = 8
+
+    def __init__(
+        self,
+        timeout: int = 30,
+        max_retries: int = 3,
+        pool_maxsize: Optional[int] = None
+    ):
         """
         Initialize RSS fetcher.
 
         Args:
             timeout: Request timeout in seconds
             max_retries: Maximum number of retry attempts
+            pool_maxsize: Connections kept alive per host; should be at least
+                the number of concurrent fetches, or extra connections are
+                closed after each request instead of being reused
         """
         self.timeout = timeout
         self.max_retries = max_retries
 
-    def fetch_feed(self, url: str) -> feedparser.FeedParserDict:
+        # Reuse connections across feeds on the same host; retries are
+        # handled by fetch_feed's backoff loop, not the adapter
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=pool_maxsize or self.POOL_MAXSIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def fetch_feed(
+        self,
+        url: str,
+        etag: Optional[str] = None,
+        modified: Optional[str] = None,
+        raw_bytes: Optional[bytes] = None,
+        content_hash: Optional[str] = None
+    ) -> Optional[feedparser.FeedParserDict]:
         """
         Fetch and parse an RSS feed.
 
+        When validators from a previous fetch are given, the request is
+        conditional and an unchanged feed costs an empty 304 response.
+        Servers that ignore them still answer 200 with the same body, so
+        a body matching content_hash is treated like a 304 without being
+        parsed. When the body was already downloaded elsewhere, pass it as
+        raw_bytes to parse it without another request.
+
         Args:
             url: RSS feed URL
+            etag: ETag header from the last fetch, sent as If-None-Match
+            modified: Last-Modified header from the last fetch, sent as
+                If-Modified-Since
+            raw_bytes: Already-downloaded feed body; skips the network fetch
+            content_hash: content_hash of the last parsed feed
 
         Returns:
-            Parsed feed object
+            Parsed feed object, with the response's validators under
+            'etag' and 'modified' (None if absent) and the SHA-256 hex
+            digest of its body under 'content_hash'; None if the feed
+            hasn't changed
 
         Raises:
             ValueError: If URL is empty
@@ -41,17 +83,43 @@ class RSSFetcher:
         if not url:
             raise ValueError("URL cannot be empty")
 
+        if raw_bytes is not None:
+            # feedparser takes the bytes as-is; no validators without a response
+            feed = feedparser.parse(raw_bytes)
+            feed['etag'] = None
+            feed['modified'] = None
+            feed['content_hash'] = hashlib.sha256(raw_bytes).hexdigest()
+            return feed
+
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if modified:
+            headers['If-Modified-Since'] = modified
+
         last_error = None
 
         for attempt in range(self.max_retries):
             try:
                 logger.info(f"Fetching feed from {url} (attempt {attempt + 1}/{self.max_retries})")
 
-                response = requests.get(url, timeout=self.timeout)
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
                 response.raise_for_status()
 
+                if response.status_code == 304:
+                    logger.info(f"Feed not modified since last fetch: {url}")
+                    return None
+
+                body_hash = hashlib.sha256(response.content).hexdigest()
+                if body_hash == content_hash:
+                    logger.info(f"Feed body unchanged since last fetch: {url}")
+                    return None
+
                 # Parse with feedparser
                 feed = feedparser.parse(response.content)
+                feed['etag'] = response.headers.get('ETag')
+                feed['modified'] = response.headers.get('Last-Modified')
+                feed['content_hash'] = body_hash
 
                 logger.info(f"Successfully fetched feed: {feed.feed.get('title', 'Unknown')}")
                 return feed
@@ -4,11 +4,12 @@ State Manager for tracking posted stories.
 Handles deduplication by tracking which stories have already been posted.
 Uses JSON file for persistence.
 """
-import json
 import logging
+import threading
+import orjson
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +22,9 @@ class StateManager:
     - Posted GUIDs per feed (with timestamps)
     - Last successful run timestamp per feed
     - Automatic cleanup of old entries
+
+    Safe to share between threads: reads and updates are serialized by a
+    per-instance lock.
     """
 
     def __init__(self, state_file: Path, max_guids_per_feed: int = 100, max_age_days: int = 30):
@@ -35,7 +39,16 @@ class StateManager:
         self.state_file = Path(state_file)
         self.max_guids_per_feed = max_guids_per_feed
         self.max_age_days = max_age_days
+        # Reentrant: mark_posted() calls cleanup_old_entries()
+        self._lock = threading.RLock()
+        # True while buffered changes haven't been written to state_file
+        self._dirty = False
+        # Feeds with buffered marks whose cleanup runs at the next save
+        self._pending_cleanup: Set[str] = set()
         self.state = self._load_state()
+        # Per-feed set of posted GUIDs for O(1) is_posted(); built lazily from
+        # state['feeds'][url]['posted_guids'] and kept in sync with it
+        self._guid_index: Dict[str, Set[str]] = {}
 
     def _load_state(self) -> Dict:
         """Load state from file, or create new state if file doesn't exist."""
@@ -46,26 +59,63 @@ class StateManager:
             return state
 
         try:
-            with open(self.state_file, 'r') as f:
-                state = json.load(f)
+            with open(self.state_file, 'rb') as f:
+                state = orjson.loads(f.read())
                 logger.info(f"Loaded state from {self.state_file}")
                 return state
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to load state file: {e}. Creating new state.")
             state = {'feeds': {}}
             self._save_state(state)
             return state
 
     def _save_state(self, state: Optional[Dict] = None):
-        """Save state to file."""
+        """
+        Save state to file atomically.
+
+        Uses write-to-temp-then-rename pattern to prevent corruption
+        if the process is interrupted during write.
+
+        Raises:
+            OSError: If write fails (after logging the error)
+        """
         if state is None:
+            # One cleanup per feed for a whole batch of buffered marks
+            while self._pending_cleanup:
+                self.cleanup_old_entries(self._pending_cleanup.pop())
             state = self.state
 
         # Ensure parent directory exists
         self.state_file.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(self.state_file, 'w') as f:
-            json.dump(state, f, indent=2)
+        # Write to temp file first for atomic update
+        temp_file = self.state_file.with_suffix('.json.tmp')
+        try:
+            with open(temp_file, 'wb') as f:
+                f.write(orjson.dumps(state, option=orjson.OPT_INDENT_2))
+            # Atomic rename (on POSIX systems)
+            temp_file.rename(self.state_file)
+        except OSError as e:
+            logger.error(f"Failed to save state file: {e}")
+            # Clean up temp file if it exists
+            if temp_file.exists():
+                try:
+                    temp_file.unlink()
+                except OSError:
+                    pass
+            raise
+
+        self._dirty = False
+
+    def flush(self):
+        """
+        Save state if there are buffered changes.
+
+        Call after a run of mark_posted_buffered() calls.
+        """
+        with self._lock:
+            if self._dirty:
+                self._save_state()
 
     def _ensure_feed_exists(self, feed_url: str):
         """Ensure feed entry exists in state."""
@@ -86,37 +136,80 @@ class StateManager:
         Returns:
             True if already posted, False otherwise
         """
-        self._ensure_feed_exists(feed_url)
+        with self._lock:
+            self._ensure_feed_exists(feed_url)
+
+            return guid in self._posted_guid_set(feed_url)
 
-        posted_guids = self.state['feeds'][feed_url]['posted_guids']
-        return any(entry['guid'] == guid for entry in posted_guids)
+    def posted_guids(self, feed_url: str) -> Set[str]:
+        """
+        Get the GUIDs already posted for a feed, for bulk membership checks.
+
+        Args:
+            feed_url: RSS feed URL
+
+        Returns:
+            Snapshot set of posted GUIDs (later marks aren't reflected)
+        """
+        with self._lock:
+            self._ensure_feed_exists(feed_url)
+            return set(self._posted_guid_set(feed_url))
+
+    def _posted_guid_set(self, feed_url: str) -> Set[str]:
+        """Get the GUID index for a feed, building it on first use."""
+        guids = self._guid_index.get(feed_url)
+        if guids is None:
+            posted_guids = self.state['feeds'][feed_url]['posted_guids']
+            guids = {entry['guid'] for entry in posted_guids}
+            self._guid_index[feed_url] = guids
+        return guids
 
     def mark_posted(self, feed_url: str, guid: str, post_uri: str):
         """
-        Mark a story as posted.
+        Mark a story as posted and save state.
 
         Args:
             feed_url: RSS feed URL
             guid: Story GUID
             post_uri: AT Proto URI of created post
         """
-        self._ensure_feed_exists(feed_url)
+        with self._lock:
+            self.mark_posted_buffered(feed_url, guid, post_uri)
+            self._save_state()  # Also runs the feed's cleanup
+
+    def mark_posted_buffered(self, feed_url: str, guid: str, post_uri: str):
+        """
+        Mark a story as posted without saving state.
 
-        # Add to posted list
-        entry = {
-            'guid': guid,
-            'post_uri': post_uri,
-            'posted_at': datetime.now().isoformat()
-        }
-        self.state['feeds'][feed_url]['posted_guids'].append(entry)
+        The change is visible to is_posted() immediately and written by the
+        next flush() (or any other save), so a burst of posts costs one
+        file write instead of one per post. Cleanup of old entries is
+        deferred to that save too, rather than re-sorting the feed's
+        entries on every mark.
 
-        # Auto-cleanup to keep state file manageable
-        self.cleanup_old_entries(feed_url)
+        Args:
+            feed_url: RSS feed URL
+            guid: Story GUID
+            post_uri: AT Proto URI of created post
+        """
+        with self._lock:
+            self._ensure_feed_exists(feed_url)
+
+            # Add to posted list
+            entry = {
+                'guid': guid,
+                'post_uri': post_uri,
+                'posted_at': datetime.now().isoformat()
+            }
+            self.state['feeds'][feed_url]['posted_guids'].append(entry)
+            if feed_url in self._guid_index:
+                self._guid_index[feed_url].add(guid)
 
-        # Save state
-        self._save_state()
+            # Auto-cleanup to keep state file manageable (at the next save)
+            self._pending_cleanup.add(feed_url)
+            self._dirty = True
 
-        logger.info(f"Marked as posted: {guid} -> {post_uri}")
+            logger.info(f"Marked as posted: {guid} -> {post_uri}")
 
     def get_last_run(self, feed_url: str) -> Optional[datetime]:
         """
@@ -128,13 +221,14 @@ class StateManager:
         Returns:
             Datetime of last run, or None if never run
         """
-        self._ensure_feed_exists(feed_url)
+        with self._lock:
+            self._ensure_feed_exists(feed_url)
 
-        timestamp_str = self.state['feeds'][feed_url]['last_successful_run']
-        if timestamp_str is None:
-            return None
+            timestamp_str = self.state['feeds'][feed_url]['last_successful_run']
+            if timestamp_str is None:
+                return None
 
-        return datetime.fromisoformat(timestamp_str)
+            return datetime.fromisoformat(timestamp_str)
 
     def update_last_run(self, feed_url: str, timestamp: datetime):
         """
@@ -144,12 +238,70 @@ class StateManager:
             feed_url: RSS feed URL
             timestamp: Timestamp of successful run
         """
-        self._ensure_feed_exists(feed_url)
+        with self._lock:
+            self._ensure_feed_exists(feed_url)
 
-        self.state['feeds'][feed_url]['last_successful_run'] = timestamp.isoformat()
-        self._save_state()
+            self.state['feeds'][feed_url]['last_successful_run'] = timestamp.isoformat()
+            self._save_state()
+
+            logger.info(f"Updated last run for {feed_url}: {timestamp}")
+
+    def get_feed_validators(self, feed_url: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Get HTTP cache validators saved from the feed's last full fetch.
+
+        Args:
+            feed_url: RSS feed URL
+
+        Returns:
+            Tuple of (etag, last_modified); either may be None
+        """
+        with self._lock:
+            self._ensure_feed_exists(feed_url)
+
+            feed_state = self.state['feeds'][feed_url]
+            return feed_state.get('etag'), feed_state.get('last_modified')
+
+    def get_feed_content_hash(self, feed_url: str) -> Optional[str]:
+        """
+        Get the body hash saved from the feed's last full fetch.
+
+        Args:
+            feed_url: RSS feed URL
+
+        Returns:
+            Hex digest of the feed body, or None
+        """
+        with self._lock:
+            self._ensure_feed_exists(feed_url)
+            return self.state['feeds'][feed_url].get('content_hash')
+
+    def update_feed_validators(
+        self,
+        feed_url: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        content_hash: Optional[str] = None
+    ):
+        """
+        Record HTTP cache validators for the next conditional fetch.
+
+        Buffered like mark_posted_buffered(): written by the next save.
+
+        Args:
+            feed_url: RSS feed URL
+            etag: ETag response header, or None
+            last_modified: Last-Modified response header, or None
+            content_hash: Hex digest of the feed body, or None
+        """
+        with self._lock:
+            self._ensure_feed_exists(feed_url)
 
-        logger.info(f"Updated last run for {feed_url}: {timestamp}")
+            feed_state = self.state['feeds'][feed_url]
+            feed_state['etag'] = etag
+            feed_state['last_modified'] = last_modified
+            feed_state['content_hash'] = content_hash
+            self._dirty = True
 
     def cleanup_old_entries(self, feed_url: str):
         """
@@ -162,29 +314,32 @@ class StateManager:
         Args:
             feed_url: RSS feed URL
         """
-        self._ensure_feed_exists(feed_url)
+        with self._lock:
+            self._ensure_feed_exists(feed_url)
 
-        posted_guids = self.state['feeds'][feed_url]['posted_guids']
+            posted_guids = self.state['feeds'][feed_url]['posted_guids']
 
-        # Filter out entries older than max_age_days
-        cutoff_date = datetime.now() - timedelta(days=self.max_age_days)
-        filtered = [
-            entry for entry in posted_guids
-            if datetime.fromisoformat(entry['posted_at']) > cutoff_date
-        ]
+            # Filter out entries older than max_age_days
+            cutoff_date = datetime.now() - timedelta(days=self.max_age_days)
+            filtered = [
+                entry for entry in posted_guids
+                if datetime.fromisoformat(entry['posted_at']) > cutoff_date
+            ]
 
-        # Keep only most recent max_guids_per_feed entries
-        # Sort by posted_at (most recent first)
-        filtered.sort(key=lambda x: x['posted_at'], reverse=True)
-        filtered = filtered[:self.max_guids_per_feed]
+            # Keep only most recent max_guids_per_feed entries
+            # Sort by posted_at (most recent first)
+            filtered.sort(key=lambda x: x['posted_at'], reverse=True)
+            filtered = filtered[:self.max_guids_per_feed]
 
-        # Update state
-        old_count = len(posted_guids)
-        new_count = len(filtered)
-        self.state['feeds'][feed_url]['posted_guids'] = filtered
+            # Update state
+            old_count = len(posted_guids)
+            new_count = len(filtered)
+            self.state['feeds'][feed_url]['posted_guids'] = filtered
 
-        if old_count != new_count:
-            logger.info(f"Cleaned up {old_count - new_count} old entries for {feed_url}")
+            if old_count != new_count:
+                # Rebuilt from the filtered list on next lookup
+                self._guid_index.pop(feed_url, None)
+                logger.info(f"Cleaned up {old_count - new_count} old entries for {feed_url}")
 
     def get_posted_count(self, feed_url: str) -> int:
         """
@@ -196,8 +351,9 @@ class StateManager:
         Returns:
             Number of posted items
         """
-        self._ensure_feed_exists(feed_url)
-        return len(self.state['feeds'][feed_url]['posted_guids'])
+        with self._lock:
+            self._ensure_feed_exists(feed_url)
+            return len(self.state['feeds'][feed_url]['posted_guids'])
 
     def get_all_posted_guids(self, feed_url: str) -> List[str]:
         """
@@ -209,5 +365,6 @@ class StateManager:
         Returns:
             List of GUIDs
         """
-        self._ensure_feed_exists(feed_url)
-        return [entry['guid'] for entry in self.state['feeds'][feed_url]['posted_guids']]
+        with self._lock:
+            self._ensure_feed_exists(feed_url)
+            return [entry['guid'] for entry in self.state['feeds'][feed_url]['posted_guids']]
@@ -4,6 +4,7 @@ Tests for Configuration Loader.
 Tests loading and validating aggregator configuration.
 """
 import pytest
+import json
 import tempfile
 from pathlib import Path
 
@@ -47,6 +48,7 @@ def temp_config_file(valid_config_yaml):
     # Cleanup
     if temp_path.exists():
         temp_path.unlink()
+    ConfigLoader(temp_path).cache_path.unlink(missing_ok=True)
 
 
 class TestConfigLoader:
@@ -165,6 +167,33 @@ feeds:
             assert config.log_level == "info"
         finally:
             temp_path.unlink()
+            ConfigLoader(temp_path).cache_path.unlink(missing_ok=True)
+
+    def test_max_workers(self):
+        """Test that max_workers defaults to None and must be a positive integer."""
+        base_yaml = """
+coves_api_url: "https://api.coves.social"
+feeds:
+  - name: "Test"
+    url: "https://test.xml"
+    community_handle: "test.coves.social"
+"""
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.yaml') as f:
+            f.write(base_yaml)
+            temp_path = Path(f.name)
+
+        try:
+            assert ConfigLoader(temp_path).load().max_workers is None
+
+            temp_path.write_text(base_yaml + "max_workers: 2\n")
+            assert ConfigLoader(temp_path).load().max_workers == 2
+
+            temp_path.write_text(base_yaml + "max_workers: -1\n")
+            with pytest.raises(ConfigError, match="max_workers"):
+                ConfigLoader(temp_path).load()
+        finally:
+            temp_path.unlink()
+            ConfigLoader(temp_path).cache_path.unlink(missing_ok=True)
 
     def test_default_enabled_true(self):
         """Test that feed enabled defaults to True if not specified."""
@@ -186,6 +215,7 @@ feeds:
             assert config.feeds[0].enabled is True
         finally:
             temp_path.unlink()
+            ConfigLoader(temp_path).cache_path.unlink(missing_ok=True)
 
     def test_invalid_url_format_raises_error(self):
         """Test that invalid URLs raise error."""
@@ -207,6 +237,26 @@ feeds:
         finally:
             temp_path.unlink()
 
+    def test_non_http_url_scheme_raises_error(self):
+        """Test that URLs with a non-HTTP scheme raise error."""
+        invalid_yaml = """
+coves_api_url: "https://api.coves.social"
+feeds:
+  - name: "Test"
+    url: "ftp://news.kagi.com/world.xml"
+    community_handle: "test.coves.social"
+"""
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.yaml') as f:
+            f.write(invalid_yaml)
+            temp_path = Path(f.name)
+
+        try:
+            with pytest.raises(ConfigError, match="Invalid URL"):
+                loader = ConfigLoader(temp_path)
+                loader.load()
+        finally:
+            temp_path.unlink()
+
     def test_empty_feeds_list_raises_error(self):
         """Test that empty feeds list raises error."""
         invalid_yaml = """
@@ -235,6 +285,61 @@ feeds: []
         # Should use env var instead of config file
         assert config.coves_api_url == "https://test.coves.social"
 
+    def test_repeated_load_returns_cached_copy(self, temp_config_file):
+        """Test that reloading an unchanged file returns an equal, independent config."""
+        loader = ConfigLoader(temp_config_file)
+        first = loader.load()
+        first.feeds.clear()
+
+        second = ConfigLoader(temp_config_file).load()
+
+        assert len(second.feeds) == 3
+        assert second is not first
+
+    def test_modified_file_is_reloaded(self, temp_config_file):
+        """Test that editing the config file invalidates the cached config."""
+        loader = ConfigLoader(temp_config_file)
+        assert loader.load().log_level == "info"
+
+        content = temp_config_file.read_text().replace('log_level: "info"', 'log_level: "debug"')
+        temp_config_file.write_text(content)
+
+        assert loader.load().log_level == "debug"
+
+    def test_writes_json_cache_next_to_config(self, temp_config_file):
+        """Test that a successful load writes the parsed YAML to a JSON sidecar."""
+        loader = ConfigLoader(temp_config_file)
+        loader.load()
+
+        assert loader.cache_path.parent == temp_config_file.parent
+        assert loader.cache_path.name == f".{temp_config_file.stem}.cache.json"
+        cached = json.loads(loader.cache_path.read_text())
+        assert cached['data']['coves_api_url'] == "https://api.coves.social"
+
+    def test_cold_start_reads_json_cache(self, temp_config_file):
+        """Test that an up-to-date sidecar is used instead of re-parsing YAML."""
+        loader = ConfigLoader(temp_config_file)
+        loader.load()
+
+        # Simulate a new process and mark the sidecar so its use is visible
+        ConfigLoader._CACHE.clear()
+        cached = json.loads(loader.cache_path.read_text())
+        cached['data']['log_level'] = "debug"
+        loader.cache_path.write_text(json.dumps(cached))
+
+        assert loader.load().log_level == "debug"
+
+    def test_stale_json_cache_is_ignored(self, temp_config_file):
+        """Test that the sidecar is ignored once the YAML file changes."""
+        loader = ConfigLoader(temp_config_file)
+        loader.load()
+
+        ConfigLoader._CACHE.clear()
+        content = temp_config_file.read_text().replace('log_level: "info"', 'log_level: "warning"')
+        temp_config_file.write_text(content)
+
+        assert loader.load().log_level == "warning"
+
     def test_get_feed_by_url(self, temp_config_file):
         """Test helper to get feed config by URL."""
         loader = ConfigLoader(temp_config_file)
@@ -3,8 +3,10 @@ Unit tests for CovesClient.
 
 Tests the client's local functionality without requiring live infrastructure.
 """
+import json
 import pytest
-from unittest.mock import Mock
+import responses
+from types import SimpleNamespace
 from src.coves_client import (
     CovesClient,
     CovesAPIError,
@@ -17,6 +19,14 @@ from src.coves_client import (
 
 # Valid test API key (70 chars total: 6 prefix + 64 hex chars)
 VALID_TEST_API_KEY = "ckapi_" + "a" * 64
+WRONG_PREFIX_KEY = "wrong_" + "a" * 64
+LONG_KEY = "ckapi_" + "a" * 100
+
+
+@pytest.fixture(scope="module")
+def client():
+    """Create one CovesClient shared by the tests that don't modify it."""
+    return CovesClient(api_url="http://localhost", api_key=VALID_TEST_API_KEY)
 
 
 class TestAPIKeyValidation:
@@ -29,9 +39,8 @@ class TestAPIKeyValidation:
 
     def test_rejects_wrong_prefix(self):
         """API key with wrong prefix should raise ValueError."""
-        wrong_prefix_key = "wrong_" + "a" * 64
         with pytest.raises(ValueError, match="must start with 'ckapi_'"):
-            CovesClient(api_url="http://localhost", api_key=wrong_prefix_key)
+            CovesClient(api_url="http://localhost", api_key=WRONG_PREFIX_KEY)
 
     def test_rejects_short_api_key(self):
         """API key that is too short should raise ValueError."""
@@ -41,9 +50,26 @@ class TestAPIKeyValidation:
 
     def test_rejects_long_api_key(self):
         """API key that is too long should raise ValueError."""
-        long_key = "ckapi_" + "a" * 100
         with pytest.raises(ValueError, match="must be 70 characters"):
-            CovesClient(api_url="http://localhost", api_key=long_key)
+            CovesClient(api_url="http://localhost", api_key=LONG_KEY)
+
+    def test_rejects_non_hex_api_key(self):
+        """API key with non-hex characters after the prefix should raise ValueError."""
+        non_hex_key = "ckapi_" + "g" * 64
+        with pytest.raises(ValueError, match="must be hex-encoded"):
+            CovesClient(api_url="http://localhost", api_key=non_hex_key)
+
+    def test_rejects_non_ascii_api_key(self):
+        """API key with non-ASCII characters should raise ValueError."""
+        non_ascii_key = "ckapi_" + "a" * 63 + "é"
+        with pytest.raises(ValueError, match="must be hex-encoded"):
+            CovesClient(api_url="http://localhost", api_key=non_ascii_key)
+
+    def test_rejects_invalid_api_key_on_every_call(self):
+        """Validation results are cached, but rejections must not be."""
+        for _ in range(2):
+            with pytest.raises(ValueError, match="must start with 'ckapi_'"):
+                CovesClient(api_url="http://localhost", api_key=WRONG_PREFIX_KEY)
 
     def test_accepts_valid_api_key(self):
         """Valid API key format should be accepted."""
@@ -51,80 +77,100 @@ class TestAPIKeyValidation:
         assert client.api_key == VALID_TEST_API_KEY
 
 
-class TestRaiseForStatus:
-    """Tests for _raise_for_status method."""
-
-    @pytest.fixture
-    def client(self):
-        """Create a CovesClient instance for testing."""
-        return CovesClient(api_url="http://localhost", api_key=VALID_TEST_API_KEY)
+class TestSession:
+    """Tests for the shared HTTP session."""
 
-    def test_raises_authentication_error_for_401(self, client):
-        """401 response should raise CovesAuthenticationError."""
-        mock_response = Mock()
-        mock_response.status_code = 401
-        mock_response.text = "Invalid API key"
+    def test_mounts_pooled_adapter(self):
+        """Session should reuse connections from an enlarged pool."""
+        client = CovesClient(api_url="https://coves.social", api_key=VALID_TEST_API_KEY)
+        adapter = client.session.get_adapter("https://coves.social/xrpc/")
 
-        with pytest.raises(CovesAuthenticationError) as exc_info:
-            client._raise_for_status(mock_response)
+        assert adapter._pool_maxsize == CovesClient.POOL_MAXSIZE
+        assert client.session.get_adapter("http://localhost/") is adapter
 
-        assert exc_info.value.status_code == 401
-        assert "Authentication failed" in str(exc_info.value)
+    def test_does_not_retry_posts_on_server_errors(self):
+        """Only 429 should be retried; a 5xx POST may already have been applied."""
+        client = CovesClient(api_url="https://coves.social", api_key=VALID_TEST_API_KEY)
+        retry = client.session.get_adapter("https://coves.social/").max_retries
 
-    def test_raises_forbidden_error_for_403(self, client):
-        """403 response should raise CovesForbiddenError."""
-        mock_response = Mock()
-        mock_response.status_code = 403
-        mock_response.text = "Not authorized for this community"
+        assert retry.is_retry("POST", 429)
+        assert not retry.is_retry("POST", 502)
+        assert not retry.is_retry("POST", 503)
+        assert retry.read == 0
 
-        with pytest.raises(CovesForbiddenError) as exc_info:
-            client._raise_for_status(mock_response)
 
-        assert exc_info.value.status_code == 403
-        assert "Access forbidden" in str(exc_info.value)
+class TestCreatePost:
+    """Tests for create_post request/response handling."""
 
-    def test_raises_not_found_error_for_404(self, client):
-        """404 response should raise CovesNotFoundError."""
-        mock_response = Mock()
-        mock_response.status_code = 404
-        mock_response.text = "Community not found"
+    @responses.activate
+    def test_sends_json_body_and_returns_uri(self, client):
+        """Post body should be JSON-encoded and the URI read from the response."""
+        responses.add(
+            responses.POST,
+            "http://localhost/xrpc/social.coves.community.post.create",
+            json={"uri": "at://did:plc:test/social.coves.post/1", "cid": "bafy"},
+            status=200
+        )
 
-        with pytest.raises(CovesNotFoundError) as exc_info:
-            client._raise_for_status(mock_response)
+        uri = client.create_post(
+            community_handle="world-news.coves.social",
+            content="Caf\u00e9 \u2014 summary",
+            facets=[],
+            title="Title"
+        )
 
-        assert exc_info.value.status_code == 404
-        assert "Resource not found" in str(exc_info.value)
+        assert uri == "at://did:plc:test/social.coves.post/1"
+        request = responses.calls[0].request
+        assert request.headers["Content-Type"] == "application/json"
+        assert json.loads(request.body) == {
+            "community": "world-news.coves.social",
+            "content": "Caf\u00e9 \u2014 summary",
+            "facets": [],
+            "title": "Title"
+        }
+
+    @responses.activate
+    def test_invalid_json_response_raises_api_error(self, client):
+        """A non-JSON success response should raise CovesAPIError."""
+        responses.add(
+            responses.POST,
+            "http://localhost/xrpc/social.coves.community.post.create",
+            body="not json",
+            status=200
+        )
 
-    def test_raises_rate_limit_error_for_429(self, client):
-        """429 response should raise CovesRateLimitError."""
-        mock_response = Mock()
-        mock_response.status_code = 429
-        mock_response.text = "Rate limit exceeded"
+        with pytest.raises(CovesAPIError, match="Invalid response"):
+            client.create_post(
+                community_handle="world-news.coves.social",
+                content="Summary",
+                facets=[]
+            )
 
-        with pytest.raises(CovesRateLimitError) as exc_info:
-            client._raise_for_status(mock_response)
 
-        assert exc_info.value.status_code == 429
-        assert "Rate limit exceeded" in str(exc_info.value)
+class TestRaiseForStatus:
+    """Tests for _raise_for_status method."""
 
-    def test_raises_generic_api_error_for_500(self, client):
-        """500 response should raise generic CovesAPIError."""
-        mock_response = Mock()
-        mock_response.status_code = 500
-        mock_response.text = "Internal server error"
+    @pytest.mark.parametrize("status_code,body,exc_class,message", [
+        (401, "Invalid API key", CovesAuthenticationError, "Authentication failed"),
+        (403, "Not authorized for this community", CovesForbiddenError, "Access forbidden"),
+        (404, "Community not found", CovesNotFoundError, "Resource not found"),
+        (429, "Rate limit exceeded", CovesRateLimitError, "Rate limit exceeded"),
+        (500, "Internal server error", CovesAPIError, "API request failed (500)"),
+    ])
+    def test_raises_error_for_status(self, client, status_code, body, exc_class, message):
+        """Each error status should raise its specific exception (500 the generic one)."""
+        mock_response = SimpleNamespace(status_code=status_code, text=body)
 
         with pytest.raises(CovesAPIError) as exc_info:
             client._raise_for_status(mock_response)
 
-        assert exc_info.value.status_code == 500
-        assert not isinstance(exc_info.value, CovesAuthenticationError)
-        assert not isinstance(exc_info.value, CovesNotFoundError)
+        assert type(exc_info.value) is exc_class
+        assert exc_info.value.status_code == status_code
+        assert message in str(exc_info.value)
 
     def test_exception_includes_response_body(self, client):
         """Exception should include the response body."""
-        mock_response = Mock()
-        mock_response.status_code = 400
-        mock_response.text = '{"error": "Bad request details"}'
+        mock_response = SimpleNamespace(status_code=400, text='{"error": "Bad request details"}')
 
         with pytest.raises(CovesAPIError) as exc_info:
             client._raise_for_status(mock_response)
@@ -132,135 +178,53 @@ class TestRaiseForStatus:
         assert exc_info.value.response_body == '{"error": "Bad request details"}'
 
 
-class TestCreateExternalEmbed:
-    """Tests for create_external_embed method."""
-
-    @pytest.fixture
-    def client(self):
-        """Create a CovesClient instance for testing."""
-        return CovesClient(
-            api_url="http://localhost:8081",
-            api_key=VALID_TEST_API_KEY
-        )
-
-    def test_creates_embed_without_sources(self, client):
-        """Test basic embed creation without sources."""
-        embed = client.create_external_embed(
-            uri="https://example.com/article",
-            title="Test Article",
-            description="Test description"
-        )
-
-        assert embed["$type"] == "social.coves.embed.external"
-        assert embed["external"]["uri"] == "https://example.com/article"
-        assert embed["external"]["title"] == "Test Article"
-        assert embed["external"]["description"] == "Test description"
-        assert "sources" not in embed["external"]
-
-    def test_creates_embed_with_sources(self, client):
-        """Test embed creation with sources array."""
-        sources = [
-            {"uri": "https://source1.com/article", "title": "Source 1", "domain": "source1.com"},
-            {"uri": "https://source2.com/article", "title": "Source 2", "domain": "source2.com"},
-        ]
+TWO_SOURCES = [
+    {"uri": "https://source1.com/article", "title": "Source 1", "domain": "source1.com"},
+    {"uri": "https://source2.com/article", "title": "Source 2", "domain": "source2.com"},
+]
+SINGLE_SOURCE = [
+    {"uri": "https://single.com/article", "title": "Single Source", "domain": "single.com"}
+]
+# Extra fields should pass through unchanged
+SOURCE_WITH_EXTRA_FIELD = [
+    {
+        "uri": "https://source.com/article",
+        "title": "Source Title",
+        "domain": "source.com",
+        "extra_field": "should be preserved"
+    }
+]
 
-        embed = client.create_external_embed(
-            uri="https://example.com/article",
-            title="Test Article",
-            description="Test description",
-            sources=sources
-        )
 
-        assert embed["$type"] == "social.coves.embed.external"
-        assert embed["external"]["uri"] == "https://example.com/article"
-        assert "sources" in embed["external"]
-        assert len(embed["external"]["sources"]) == 2
-        assert embed["external"]["sources"][0]["uri"] == "https://source1.com/article"
-        assert embed["external"]["sources"][0]["title"] == "Source 1"
-        assert embed["external"]["sources"][0]["domain"] == "source1.com"
-        assert embed["external"]["sources"][1]["uri"] == "https://source2.com/article"
-
-    def test_creates_embed_with_empty_sources_list(self, client):
-        """Test that empty sources list is excluded from embed."""
-        embed = client.create_external_embed(
-            uri="https://example.com/article",
-            title="Test Article",
-            description="Test description",
-            sources=[]
-        )
-
-        assert embed["$type"] == "social.coves.embed.external"
-        assert "sources" not in embed["external"]
+class TestCreateExternalEmbed:
+    """Tests for create_external_embed method."""
 
-    def test_creates_embed_with_none_sources(self, client):
-        """Test that None sources is handled correctly."""
+    @pytest.mark.parametrize("extra_kwargs,expected_sources", [
+        pytest.param({}, None, id="no_sources"),
+        pytest.param({"sources": []}, None, id="empty_sources"),
+        pytest.param({"sources": None}, None, id="none_sources"),
+        pytest.param({"sources": SINGLE_SOURCE}, SINGLE_SOURCE, id="single_source"),
+        pytest.param({"sources": TWO_SOURCES}, TWO_SOURCES, id="two_sources"),
+        pytest.param({"sources": SOURCE_WITH_EXTRA_FIELD}, SOURCE_WITH_EXTRA_FIELD, id="extra_source_fields"),
+    ])
+    def test_creates_embed(self, client, extra_kwargs, expected_sources):
+        """Embed should match the social.coves.embed.external lexicon, with sources only when non-empty."""
         embed = client.create_external_embed(
             uri="https://example.com/article",
             title="Test Article",
             description="Test description",
-            sources=None
+            **extra_kwargs
         )
 
+        # Only $type and external at the top level
         assert embed["$type"] == "social.coves.embed.external"
-        assert "sources" not in embed["external"]
-
-    def test_creates_embed_with_single_source(self, client):
-        """Test embed creation with single source."""
-        sources = [
-            {"uri": "https://single.com/article", "title": "Single Source", "domain": "single.com"}
-        ]
-
-        embed = client.create_external_embed(
-            uri="https://example.com/article",
-            title="Test Article",
-            description="Test description",
-            sources=sources
-        )
-
-        assert len(embed["external"]["sources"]) == 1
-        assert embed["external"]["sources"][0]["uri"] == "https://single.com/article"
+        assert len(embed) == 2
 
-    def test_embed_structure_matches_lexicon(self, client):
-        """Test that embed structure matches social.coves.embed.external lexicon."""
-        sources = [
-            {"uri": "https://source.com/article", "title": "Source", "domain": "source.com"}
-        ]
-
-        embed = client.create_external_embed(
-            uri="https://example.com/article",
-            title="Test Article",
-            description="Test description",
-            sources=sources
-        )
-
-        # Verify top-level structure
-        assert "$type" in embed
-        assert "external" in embed
-        assert len(embed) == 2  # Only $type and external
-
-        # Verify external object structure
         external = embed["external"]
-        assert "uri" in external
-        assert "title" in external
-        assert "description" in external
-        assert "sources" in external
-
-    def test_preserves_source_structure(self, client):
-        """Test that source dictionaries are passed through unchanged."""
-        sources = [
-            {
-                "uri": "https://source.com/article",
-                "title": "Source Title",
-                "domain": "source.com",
-                "extra_field": "should be preserved"  # Extra fields should pass through
-            }
-        ]
-
-        embed = client.create_external_embed(
-            uri="https://example.com/article",
-            title="Test Article",
-            description="Test description",
-            sources=sources
-        )
-
-        assert embed["external"]["sources"][0]["extra_field"] == "should be preserved"
+        assert external["uri"] == "https://example.com/article"
+        assert external["title"] == "Test Article"
+        assert external["description"] == "Test description"
+        if expected_sources is None:
+            assert "sources" not in external
+        else:
+            assert external["sources"] == expected_sources
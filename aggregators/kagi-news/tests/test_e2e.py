@@ -12,16 +12,44 @@ Requires:
 - Test database with community: e2e-95206.community.coves.social
 - Aggregator account: kagi-news.local.coves.dev
 """
+import logging
 import os
+import time
 import pytest
+import requests
 import responses
+from requests.adapters import HTTPAdapter
 from pathlib import Path
+from unittest.mock import patch
 from datetime import datetime
 
 from src.main import Aggregator
 from src.coves_client import CovesClient
 from src.config import ConfigLoader
 
+logger = logging.getLogger(__name__)
+
+
+# Valid RSS with no items, for runs that must not post anything
+EMPTY_RSS_BODY = b'<?xml version="1.0"?><rss version="2.0"><channel></channel></rss>'
+
+
+class StaticFeedAdapter(HTTPAdapter):
+    """Transport adapter that answers every request with one fixed feed body."""
+
+    def __init__(self, body: bytes):
+        super().__init__()
+        self.body = body
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response.headers['Content-Type'] = 'application/xml'
+        response._content = self.body
+        response.url = request.url
+        response.request = request
+        return response
+
 
 # Skip E2E tests by default (require live infrastructure)
 pytestmark = pytest.mark.skipif(
@@ -30,24 +58,36 @@ pytestmark = pytest.mark.skipif(
 )
 
 
-@pytest.fixture
-def test_community(aggregator_credentials):
-    """Create a test community for E2E testing."""
-    import time
-    import requests
+@pytest.fixture(scope="session")
+def http_session():
+    """Keep-alive session for fixture setup calls to the PDS and AppView."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    yield session
+    session.close()
+
 
+@pytest.fixture(scope="session")
+def test_community(aggregator_credentials, http_session):
+    """Create a test community once for the E2E session (tests only post to it)."""
     handle, password = aggregator_credentials
 
     # Authenticate
-    auth_response = requests.post(
+    auth_response = http_session.post(
         "http://localhost:3001/xrpc/com.atproto.server.createSession",
         json={"identifier": handle, "password": password}
     )
     token = auth_response.json()["accessJwt"]
 
-    # Create community (use short name to avoid handle length limits)
-    community_name = f"e2e-{int(time.time()) % 10000}"  # Last 4 digits only
-    create_response = requests.post(
+    # Create community (use short name to avoid handle length limits).
+    # Under pytest-xdist each worker runs its own session, so the worker
+    # id keeps communities created in the same second apart.
+    worker = os.getenv('PYTEST_XDIST_WORKER', '')
+    suffix = f"{worker}-" if worker else ""
+    community_name = f"e2e-{suffix}{int(time.time()) % 10000}"  # Last 4 digits only
+    create_response = http_session.post(
         "http://localhost:8081/xrpc/social.coves.community.create",
         headers={"Authorization": f"Bearer {token}"},
         json={
@@ -61,14 +101,14 @@ def test_community(aggregator_credentials):
     if create_response.ok:
         community = create_response.json()
         community_handle = f"{community_name}.community.coves.social"
-        print(f"\n✅ Created test community: {community_handle}")
+        logger.info(f"Created test community: {community_handle}")
         return community_handle
     else:
         raise Exception(f"Failed to create community: {create_response.text}")
 
 
-@pytest.fixture
-def test_config_file(tmp_path, test_community):
+@pytest.fixture(scope="session")
+def test_config_file(tmp_path_factory, test_community):
     """Create test configuration file with dynamic community."""
     config_content = f"""
 coves_api_url: http://localhost:8081
@@ -81,7 +121,7 @@ feeds:
 
 log_level: debug
 """
-    config_file = tmp_path / "config.yaml"
+    config_file = tmp_path_factory.mktemp("config") / "config.yaml"
     config_file.write_text(config_content)
     return config_file
 
@@ -92,18 +132,18 @@ def test_state_file(tmp_path):
     return tmp_path / "state.json"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_kagi_feed():
-    """Load real Kagi RSS feed fixture."""
+    """Load real Kagi RSS feed fixture (read once; the content never changes)."""
     # Load from data directory (where actual feed is stored)
     fixture_path = Path(__file__).parent.parent / "data" / "world.xml"
     if not fixture_path.exists():
         # Fallback to tests/fixtures if moved
         fixture_path = Path(__file__).parent / "fixtures" / "world.xml"
-    return fixture_path.read_text()
+    return fixture_path.read_bytes()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def aggregator_credentials():
     """Get aggregator credentials from environment."""
     handle = os.getenv('AGGREGATOR_HANDLE', 'kagi-news.local.coves.dev')
@@ -111,16 +151,40 @@ def aggregator_credentials():
     return handle, password
 
 
+@pytest.fixture(scope="session")
+def authed_client():
+    """Create one authenticated CovesClient shared by every aggregator run."""
+    api_key = os.getenv('COVES_API_KEY')
+    if not api_key:
+        pytest.skip("COVES_API_KEY is required to post to the test AppView")
+
+    client = CovesClient(api_url="http://localhost:8081", api_key=api_key)
+    client.authenticate()
+    return client
+
+
+@pytest.fixture(scope="session", autouse=True)
+def aggregator_env(aggregator_credentials):
+    """Export the aggregator credentials once for every E2E test."""
+    handle, password = aggregator_credentials
+    # monkeypatch is function-scoped, so use a context that lasts the session;
+    # the variables are restored when it ends instead of leaking
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('AGGREGATOR_HANDLE', handle)
+        mp.setenv('AGGREGATOR_PASSWORD', password)
+        mp.setenv('PDS_URL', 'http://localhost:3001')  # Auth through PDS
+        yield
+
+
 class TestEndToEnd:
     """Full end-to-end integration tests."""
 
-    @responses.activate
     def test_full_aggregator_workflow(
         self,
         test_config_file,
         test_state_file,
         mock_kagi_feed,
-        aggregator_credentials
+        authed_client
     ):
         """
         Test complete workflow: fetch → parse → format → post → verify.
@@ -130,155 +194,95 @@ class TestEndToEnd:
         2. Authenticates with real PDS
         3. Parses real Kagi HTML content
         4. Formats with rich text facets
-        5. Posts to real community
+        5. Posts to real community, with external embeds
         6. Verifies post was created
         7. Tests deduplication (no repost)
         """
-        # Mock Kagi RSS feed
-        responses.add(
-            responses.GET,
-            "https://news.kagi.com/world.xml",
-            body=mock_kagi_feed,
-            status=200,
-            content_type="application/xml"
-        )
-
-        # Allow passthrough for localhost (PDS)
-        responses.add_passthru("http://localhost")
-
-        # Set up environment
-        handle, password = aggregator_credentials
-        os.environ['AGGREGATOR_HANDLE'] = handle
-        os.environ['AGGREGATOR_PASSWORD'] = password
-        os.environ['PDS_URL'] = 'http://localhost:3001'  # Auth through PDS
+        # Serve the Kagi RSS feed from the fetcher's own session; requests to
+        # localhost (AppView) go out normally
+        feed_adapter = StaticFeedAdapter(mock_kagi_feed)
 
         # Create aggregator
         aggregator = Aggregator(
             config_path=test_config_file,
-            state_file=test_state_file
+            state_file=test_state_file,
+            coves_client=authed_client
         )
+        aggregator.rss_fetcher.session.mount("https://news.kagi.com/", feed_adapter)
 
-        # Run first time: should post stories
-        print("\n" + "="*60)
-        print("🚀 Running first aggregator pass (should post stories)")
-        print("="*60)
-        aggregator.run()
+        # Run first time: should post stories (spy on the posts it sends)
+        with patch.object(
+            authed_client, 'create_post', wraps=authed_client.create_post
+        ) as create_post:
+            aggregator.run()
 
         # Verify state was updated (stories marked as posted)
         posted_count = aggregator.state_manager.get_posted_count(
             "https://news.kagi.com/world.xml"
         )
-        print(f"\n✅ First pass: {posted_count} stories posted and tracked")
+        logger.info(f"First pass: {posted_count} stories posted and tracked")
         assert posted_count > 0, "Should have posted at least one story"
 
+        # Every post carried an external embed with its title and description
+        assert create_post.call_count >= posted_count
+        for call in create_post.call_args_list:
+            embed = call.kwargs["embed"]
+            assert embed["$type"] == "social.coves.embed.external"
+            assert embed["external"]["title"] == call.kwargs["title"]
+            assert "description" in embed["external"]
+
         # Create new aggregator instance (simulates CRON re-run)
         aggregator2 = Aggregator(
             config_path=test_config_file,
-            state_file=test_state_file
+            state_file=test_state_file,
+            coves_client=authed_client
         )
+        aggregator2.rss_fetcher.session.mount("https://news.kagi.com/", feed_adapter)
 
-        # Run second time: should skip duplicates
-        print("\n" + "="*60)
-        print("🔄 Running second aggregator pass (should skip duplicates)")
-        print("="*60)
-        aggregator2.run()
+        # Forget the feed's validators and body hash: the adapter serves the
+        # same bytes, which would otherwise be skipped as unchanged before
+        # the entries ever reach the GUID check
+        feed_url = "https://news.kagi.com/world.xml"
+        aggregator2.state_manager.update_feed_validators(feed_url, None, None, None)
 
-        # Verify count didn't change (deduplication worked)
-        posted_count2 = aggregator2.state_manager.get_posted_count(
-            "https://news.kagi.com/world.xml"
-        )
-        print(f"\n✅ Second pass: Still {posted_count2} stories (duplicates skipped)")
+        # Run second time: should skip duplicates
+        with patch.object(
+            authed_client, 'create_post', wraps=authed_client.create_post
+        ) as create_post:
+            aggregator2.run()
+
+        # The feed was parsed in full (its body hash is saved again)...
+        assert aggregator2.state_manager.get_feed_content_hash(feed_url) is not None
+        # ...and every story was recognized as already posted
+        create_post.assert_not_called()
+        posted_count2 = aggregator2.state_manager.get_posted_count(feed_url)
+        logger.info(f"Second pass: still {posted_count2} stories (duplicates skipped)")
         assert posted_count2 == posted_count, "Should not post duplicates"
 
-    @responses.activate
-    def test_post_with_external_embed(
-        self,
-        test_config_file,
-        test_state_file,
-        mock_kagi_feed,
-        aggregator_credentials
-    ):
+    def test_authentication_with_api_key(self, authed_client):
         """
-        Test that posts include external embeds with images.
+        Test API key authentication on the shared client.
 
         Verifies:
-        - External embed is created
-        - Thumbnail URL is included
-        - Title and description are set
+        - authenticate() leaves the client ready to post
+        - Every request carries the API key as a bearer token
+        - API key has the server's format (ckapi_ + 64 hex characters)
         """
-        # Mock Kagi RSS feed
-        responses.add(
-            responses.GET,
-            "https://news.kagi.com/world.xml",
-            body=mock_kagi_feed,
-            status=200
-        )
-
-        # Allow passthrough for localhost (PDS)
-        responses.add_passthru("http://localhost")
-
-        # Set up environment
-        handle, password = aggregator_credentials
-        os.environ['AGGREGATOR_HANDLE'] = handle
-        os.environ['AGGREGATOR_PASSWORD'] = password
-        os.environ['PDS_URL'] = 'http://localhost:3001'  # Auth through PDS
-
-        # Run aggregator
-        aggregator = Aggregator(
-            config_path=test_config_file,
-            state_file=test_state_file
-        )
+        authed_client.authenticate()
 
-        print("\n" + "="*60)
-        print("🖼️  Testing external embed creation")
-        print("="*60)
-        aggregator.run()
-
-        # Verify posts were created
-        posted_count = aggregator.state_manager.get_posted_count(
-            "https://news.kagi.com/world.xml"
-        )
-        print(f"\n✅ Posted {posted_count} stories with external embeds")
-        assert posted_count > 0
-
-    def test_authentication_with_live_pds(self, aggregator_credentials):
-        """
-        Test authentication against live PDS.
-
-        Verifies:
-        - Can authenticate with aggregator account
-        - Receives valid JWT tokens
-        - DID matches expected format
-        """
-        handle, password = aggregator_credentials
-
-        print("\n" + "="*60)
-        print(f"🔐 Testing authentication: {handle}")
-        print("="*60)
-
-        # Create client and authenticate
-        client = CovesClient(
-            api_url="http://localhost:8081",  # AppView for posting
-            handle=handle,
-            password=password,
-            pds_url="http://localhost:3001"  # PDS for auth
-        )
-
-        client.authenticate()
-
-        print(f"\n✅ Authentication successful")
-        print(f"   Handle: {client.handle}")
-        print(f"   Authenticated: {client._authenticated}")
-
-        assert client._authenticated is True
-        assert hasattr(client, 'did')
-        assert client.did.startswith("did:plc:")
+        api_key = authed_client.api_key
+        assert api_key.startswith(CovesClient.API_KEY_PREFIX)
+        assert len(api_key) == CovesClient.API_KEY_TOTAL_LENGTH
+        assert authed_client.session.headers["Authorization"] == f"Bearer {api_key}"
+        assert authed_client.session.headers["Content-Type"] == "application/json"
+        assert authed_client.api_url == "http://localhost:8081"
 
+    @responses.activate
     def test_state_persistence_across_runs(
         self,
         test_config_file,
         test_state_file,
-        aggregator_credentials
+        authed_client
     ):
         """
         Test that state persists correctly across multiple runs.
@@ -290,45 +294,36 @@ class TestEndToEnd:
         - State survives aggregator restart
         """
         # Mock empty feed (to avoid posting)
-        import responses as resp
-        resp.start()
-        resp.add(
-            resp.GET,
+        responses.add(
+            responses.GET,
             "https://news.kagi.com/world.xml",
-            body='<?xml version="1.0"?><rss version="2.0"><channel></channel></rss>',
+            body=EMPTY_RSS_BODY,
             status=200
         )
 
-        handle, password = aggregator_credentials
-        os.environ['AGGREGATOR_HANDLE'] = handle
-        os.environ['AGGREGATOR_PASSWORD'] = password
-
-        print("\n" + "="*60)
-        print("💾 Testing state persistence")
-        print("="*60)
-
         # First run
         aggregator1 = Aggregator(
             config_path=test_config_file,
-            state_file=test_state_file
+            state_file=test_state_file,
+            coves_client=authed_client
         )
         aggregator1.run()
 
         # Verify state file was created
         assert test_state_file.exists(), "State file should be created"
-        print(f"\n✅ State file created: {test_state_file}")
 
         # Verify last run was recorded
         last_run1 = aggregator1.state_manager.get_last_run(
             "https://news.kagi.com/world.xml"
         )
         assert last_run1 is not None, "Last run should be recorded"
-        print(f"   Last run: {last_run1}")
+        logger.info(f"Last run: {last_run1}")
 
         # Second run (new instance)
         aggregator2 = Aggregator(
             config_path=test_config_file,
-            state_file=test_state_file
+            state_file=test_state_file,
+            coves_client=authed_client
         )
         aggregator2.run()
 
@@ -337,17 +332,14 @@ class TestEndToEnd:
             "https://news.kagi.com/world.xml"
         )
         assert last_run2 >= last_run1, "Last run should be updated"
-        print(f"   Last run (after restart): {last_run2}")
-        print(f"\n✅ State persisted across aggregator restarts")
-
-        resp.stop()
-        resp.reset()
+        logger.info(f"Last run (after restart): {last_run2}")
 
+    @responses.activate
     def test_error_recovery(
         self,
         test_config_file,
         test_state_file,
-        aggregator_credentials
+        authed_client
     ):
         """
         Test that aggregator handles errors gracefully.
@@ -358,40 +350,39 @@ class TestEndToEnd:
         - Logs errors appropriately
         """
         # Mock feed failure
-        import responses as resp
-        resp.start()
-        resp.add(
-            resp.GET,
+        responses.add(
+            responses.GET,
             "https://news.kagi.com/world.xml",
             body="Internal Server Error",
             status=500
         )
 
-        handle, password = aggregator_credentials
-        os.environ['AGGREGATOR_HANDLE'] = handle
-        os.environ['AGGREGATOR_PASSWORD'] = password
-
-        print("\n" + "="*60)
-        print("🛡️  Testing error recovery")
-        print("="*60)
-
         # Should not crash
         aggregator = Aggregator(
             config_path=test_config_file,
-            state_file=test_state_file
+            state_file=test_state_file,
+            coves_client=authed_client
         )
 
         try:
             aggregator.run()
-            print(f"\n✅ Aggregator handled feed error gracefully")
         except Exception as e:
             pytest.fail(f"Aggregator should handle errors gracefully: {e}")
 
-        resp.stop()
-        resp.reset()
+
+EMBED_SOURCES = [
+    {"uri": "https://source1.com/article", "title": "Source 1 Article", "domain": "source1.com"},
+    {"uri": "https://source2.com/story", "title": "Source 2 Story", "domain": "source2.com"},
+]
 
 
-def test_coves_client_external_embed_format(aggregator_credentials):
+@pytest.mark.parametrize("extra_kwargs,expected_sources", [
+    pytest.param({}, None, id="no_sources"),
+    pytest.param({"sources": EMBED_SOURCES}, EMBED_SOURCES, id="with_sources"),
+    # Regression: an empty sources list must not be included
+    pytest.param({"sources": []}, None, id="empty_sources"),
+])
+def test_coves_client_external_embed_format(authed_client, extra_kwargs, expected_sources):
     """
     Test external embed formatting.
 
@@ -399,20 +390,13 @@ def test_coves_client_external_embed_format(aggregator_credentials):
     - Embed structure matches social.coves.embed.external
     - All required fields are present
     - Thumbnails are handled by server's unfurl service (not included in client)
+    - Sources array is included only when non-empty
     """
-    handle, password = aggregator_credentials
-
-    client = CovesClient(
-        api_url="http://localhost:8081",
-        handle=handle,
-        password=password
-    )
-
-    # Create external embed (server will handle thumbnail extraction)
-    embed = client.create_external_embed(
+    embed = authed_client.create_external_embed(
         uri="https://example.com/story",
         title="Test Story",
-        description="Test description"
+        description="Test description",
+        **extra_kwargs
     )
 
     assert embed["$type"] == "social.coves.embed.external"
@@ -421,79 +405,7 @@ def test_coves_client_external_embed_format(aggregator_credentials):
     assert embed["external"]["description"] == "Test description"
     # Thumbnail is not included - server's unfurl service handles it
     assert "thumb" not in embed["external"]
-    # Sources should not be present when not provided
-    assert "sources" not in embed["external"]
-    print("\n✅ External embed format correct (no sources)")
-
-
-def test_coves_client_external_embed_with_sources(aggregator_credentials):
-    """
-    Test external embed formatting with sources.
-
-    Verifies:
-    - Embed structure matches social.coves.embed.external
-    - Sources array is included when provided
-    - Each source has uri, title, domain
-    """
-    handle, password = aggregator_credentials
-
-    client = CovesClient(
-        api_url="http://localhost:8081",
-        handle=handle,
-        password=password
-    )
-
-    # Create external embed with sources
-    sources = [
-        {"uri": "https://source1.com/article", "title": "Source 1 Article", "domain": "source1.com"},
-        {"uri": "https://source2.com/story", "title": "Source 2 Story", "domain": "source2.com"},
-    ]
-
-    embed = client.create_external_embed(
-        uri="https://example.com/story",
-        title="Test Story With Sources",
-        description="Test description with sources",
-        sources=sources
-    )
-
-    assert embed["$type"] == "social.coves.embed.external"
-    assert embed["external"]["uri"] == "https://example.com/story"
-    assert embed["external"]["title"] == "Test Story With Sources"
-    assert embed["external"]["description"] == "Test description with sources"
-    # Sources should be present
-    assert "sources" in embed["external"]
-    assert len(embed["external"]["sources"]) == 2
-    assert embed["external"]["sources"][0]["uri"] == "https://source1.com/article"
-    assert embed["external"]["sources"][0]["title"] == "Source 1 Article"
-    assert embed["external"]["sources"][0]["domain"] == "source1.com"
-    assert embed["external"]["sources"][1]["uri"] == "https://source2.com/story"
-    print("\n✅ External embed format correct (with sources)")
-
-
-def test_coves_client_external_embed_with_empty_sources(aggregator_credentials):
-    """
-    Test external embed formatting with empty sources list.
-
-    Verifies:
-    - Empty sources list is not included in embed (regression test)
-    """
-    handle, password = aggregator_credentials
-
-    client = CovesClient(
-        api_url="http://localhost:8081",
-        handle=handle,
-        password=password
-    )
-
-    # Create external embed with empty sources list
-    embed = client.create_external_embed(
-        uri="https://example.com/story",
-        title="Test Story",
-        description="Test description",
-        sources=[]
-    )
-
-    assert embed["$type"] == "social.coves.embed.external"
-    # Empty sources list should not be included
-    assert "sources" not in embed["external"]
-    print("\n✅ External embed format correct (empty sources excluded)")
+    if expected_sources is None:
+        assert "sources" not in embed["external"]
+    else:
+        assert embed["external"]["sources"] == expected_sources
@@ -4,16 +4,51 @@ Tests for Main Orchestration Script.
 Tests the complete flow: fetch → parse → format → dedupe → post → update state.
 """
 import pytest
+import threading
+import time
+from collections import namedtuple
+from contextlib import ExitStack
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 from datetime import datetime
-from unittest.mock import Mock, MagicMock, patch, call
+from types import SimpleNamespace
+from typing import Optional
+from unittest.mock import Mock, patch, call
 import feedparser
 
 from src.main import Aggregator
+from src.state_manager import StateManager
 from src.models import KagiStory, AggregatorConfig, FeedConfig, Perspective, Quote, Source
 
 
-@pytest.fixture
+# Plain stand-ins for feedparser results: Aggregator only reads attributes,
+# and dataclasses avoid MagicMock's per-access child mock machinery
+Tag = namedtuple("Tag", "term")
+
+
+@dataclass
+class FakeEntry:
+    """Feed entry with the attributes Aggregator reads."""
+    title: str
+    link: str
+    guid: str
+    published_parsed: tuple = (2024, 1, 15, 12, 0, 0, 0, 15, 0)
+    tags: list = field(default_factory=list)
+    description: str = ""
+
+
+@dataclass
+class FakeFeed:
+    """Parsed feed with the attributes Aggregator reads."""
+    entries: list = field(default_factory=list)
+    bozo: int = 0
+    etag: Optional[str] = None
+    modified: Optional[str] = None
+    content_hash: Optional[str] = None
+
+
+# Module-scoped fixtures are built once and shared: tests must not modify them
+@pytest.fixture(scope="module")
 def mock_config():
     """Mock aggregator configuration."""
     return AggregatorConfig(
@@ -42,7 +77,7 @@ def mock_config():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_story():
     """Sample KagiStory for testing."""
     return KagiStory(
@@ -69,30 +104,54 @@ def sample_story():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_rss_feed():
     """Mock RSS feed with sample entries."""
-    feed = MagicMock()
-    feed.bozo = 0
-    feed.entries = [
-        MagicMock(
+    return FakeFeed(entries=[
+        FakeEntry(
             title="Story 1",
             link="https://kite.kagi.com/test/world/1",
             guid="https://kite.kagi.com/test/world/1",
             published_parsed=(2024, 1, 15, 12, 0, 0, 0, 15, 0),
-            tags=[MagicMock(term="World")],
+            tags=[Tag(term="World")],
             description="<p>Story 1 description</p>"
         ),
-        MagicMock(
+        FakeEntry(
             title="Story 2",
             link="https://kite.kagi.com/test/world/2",
             guid="https://kite.kagi.com/test/world/2",
             published_parsed=(2024, 1, 15, 13, 0, 0, 0, 15, 0),
-            tags=[MagicMock(term="World")],
+            tags=[Tag(term="World")],
             description="<p>Story 2 description</p>"
         )
-    ]
-    return feed
+    ])
+
+
+@pytest.fixture
+def patched_deps(mock_config, mock_rss_feed, sample_story):
+    """
+    Patch the components Aggregator builds, all in one ExitStack.
+
+    Yields the instances the Aggregator will get: loader returns
+    mock_config, fetcher returns mock_rss_feed, parser returns
+    sample_story and formatter returns plain content. Tests override
+    return values as needed.
+    """
+    with ExitStack() as stack:
+        deps = SimpleNamespace(
+            loader=stack.enter_context(patch('src.main.ConfigLoader')).return_value,
+            fetcher=stack.enter_context(patch('src.main.RSSFetcher')).return_value,
+            parser=stack.enter_context(patch('src.main.KagiHTMLParser')).return_value,
+            formatter=stack.enter_context(patch('src.main.RichTextFormatter')).return_value,
+        )
+        deps.loader.load.return_value = mock_config
+        deps.fetcher.fetch_feed.return_value = mock_rss_feed
+        deps.parser.parse_to_story.return_value = sample_story
+        deps.formatter.format_full.return_value = {
+            "content": "Test content",
+            "facets": []
+        }
+        yield deps
 
 
 class TestAggregator:
@@ -116,67 +175,115 @@ class TestAggregator:
             assert aggregator.config == mock_config
             assert aggregator.state_file == state_file
 
-    def test_process_enabled_feeds_only(self, mock_config, tmp_path):
+    def test_process_enabled_feeds_only(self, patched_deps, tmp_path):
         """Test that only enabled feeds are processed."""
         state_file = tmp_path / "state.json"
         mock_client = Mock()
+        # Mock empty feeds
+        patched_deps.fetcher.fetch_feed.return_value = FakeFeed()
 
-        with patch('src.main.ConfigLoader') as MockConfigLoader, \
-             patch('src.main.RSSFetcher') as MockRSSFetcher:
+        aggregator = Aggregator(
+            config_path=Path("config.yaml"),
+            state_file=state_file,
+            coves_client=mock_client
+        )
+        aggregator.run()
 
-            mock_loader = Mock()
-            mock_loader.load.return_value = mock_config
-            MockConfigLoader.return_value = mock_loader
+        # Should only fetch enabled feeds (2)
+        assert patched_deps.fetcher.fetch_feed.call_count == 2
 
-            mock_fetcher = Mock()
-            MockRSSFetcher.return_value = mock_fetcher
+    def test_full_successful_flow(self, patched_deps, tmp_path):
+        """Test complete flow: fetch → parse → format → post → update state."""
+        state_file = tmp_path / "state.json"
+        mock_client = Mock()
+        mock_client.create_post.return_value = "at://did:plc:test/social.coves.post/abc123"
 
-            aggregator = Aggregator(
-                config_path=Path("config.yaml"),
-                state_file=state_file,
-                coves_client=mock_client
-            )
+        # Run aggregator
+        aggregator = Aggregator(
+            config_path=Path("config.yaml"),
+            state_file=state_file,
+            coves_client=mock_client
+        )
+        aggregator.run()
 
-            # Mock empty feeds
-            mock_fetcher.fetch_feed.return_value = MagicMock(bozo=0, entries=[])
+        # Verify RSS fetching
+        assert patched_deps.fetcher.fetch_feed.call_count == 2
 
-            aggregator.run()
+        # Verify parsing (2 entries per feed * 2 feeds = 4 total)
+        assert patched_deps.parser.parse_to_story.call_count == 4
 
-            # Should only fetch enabled feeds (2)
-            assert mock_fetcher.fetch_feed.call_count == 2
+        # Verify formatting
+        assert patched_deps.formatter.format_full.call_count == 4
 
-    def test_full_successful_flow(self, mock_config, mock_rss_feed, sample_story, tmp_path):
-        """Test complete flow: fetch → parse → format → post → update state."""
+        # Verify posting (should call create_post for each story)
+        assert mock_client.create_post.call_count == 4
+
+    def test_each_feed_writes_state_once(self, patched_deps, tmp_path):
+        """Test that a feed's posts, validators and last run are saved in one write."""
         state_file = tmp_path / "state.json"
         mock_client = Mock()
         mock_client.create_post.return_value = "at://did:plc:test/social.coves.post/abc123"
 
-        with patch('src.main.ConfigLoader') as MockConfigLoader, \
-             patch('src.main.RSSFetcher') as MockRSSFetcher, \
-             patch('src.main.KagiHTMLParser') as MockHTMLParser, \
-             patch('src.main.RichTextFormatter') as MockFormatter:
+        aggregator = Aggregator(
+            config_path=Path("config.yaml"),
+            state_file=state_file,
+            coves_client=mock_client
+        )
+        state_manager = aggregator.state_manager
+        with patch.object(state_manager, '_save_state', wraps=state_manager._save_state) as save:
+            aggregator.run()
 
-            # Setup mocks
-            mock_loader = Mock()
-            mock_loader.load.return_value = mock_config
-            MockConfigLoader.return_value = mock_loader
+        assert save.call_count == 2  # One per enabled feed
+        reloaded = StateManager(state_file)
+        assert reloaded.get_posted_count("https://news.kagi.com/world.xml") == 2
+        assert reloaded.get_last_run("https://news.kagi.com/tech.xml") is not None
 
-            mock_fetcher = Mock()
-            mock_fetcher.fetch_feed.return_value = mock_rss_feed
-            MockRSSFetcher.return_value = mock_fetcher
+    def test_posts_are_sent_concurrently(self, patched_deps, tmp_path):
+        """Test that a feed's posts are in flight at the same time."""
+        state_file = tmp_path / "state.json"
+        # Each post waits for the other; serial posting would break the barrier
+        barrier = threading.Barrier(2, timeout=5)
 
-            mock_parser = Mock()
-            mock_parser.parse_to_story.return_value = sample_story
-            MockHTMLParser.return_value = mock_parser
+        def create_post(**kwargs):
+            barrier.wait()
+            return "at://did:plc:test/social.coves.post/abc123"
 
-            mock_formatter = Mock()
-            mock_formatter.format_full.return_value = {
-                "content": "Test content",
-                "facets": []
-            }
-            MockFormatter.return_value = mock_formatter
+        mock_client = Mock()
+        mock_client.create_post.side_effect = create_post
+
+        aggregator = Aggregator(
+            config_path=Path("config.yaml"),
+            state_file=state_file,
+            coves_client=mock_client
+        )
+        aggregator.run()
+
+        # Both stories of both feeds were posted and recorded
+        for feed_url in ("https://news.kagi.com/world.xml", "https://news.kagi.com/tech.xml"):
+            assert aggregator.state_manager.is_posted(feed_url, "https://kite.kagi.com/test/world/1")
+            assert aggregator.state_manager.is_posted(feed_url, "https://kite.kagi.com/test/world/2")
 
-            # Run aggregator
+    def test_posts_share_one_pool_across_feeds(self, patched_deps, tmp_path):
+        """Test that MAX_CONCURRENT_POSTS caps in-flight posts for the whole run."""
+        state_file = tmp_path / "state.json"
+        lock = threading.Lock()
+        in_flight = 0
+        peak = 0
+
+        def create_post(**kwargs):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.01)
+            with lock:
+                in_flight -= 1
+            return "at://did:plc:test/social.coves.post/abc123"
+
+        mock_client = Mock()
+        mock_client.create_post.side_effect = create_post
+
+        with patch.object(Aggregator, 'MAX_CONCURRENT_POSTS', 1):
             aggregator = Aggregator(
                 config_path=Path("config.yaml"),
                 state_file=state_file,
@@ -184,220 +291,231 @@ class TestAggregator:
             )
             aggregator.run()
 
-            # Verify RSS fetching
-            assert mock_fetcher.fetch_feed.call_count == 2
-
-            # Verify parsing (2 entries per feed * 2 feeds = 4 total)
-            assert mock_parser.parse_to_story.call_count == 4
-
-            # Verify formatting
-            assert mock_formatter.format_full.call_count == 4
-
-            # Verify posting (should call create_post for each story)
+            # Two feeds posted concurrently, but never more than one post at once
             assert mock_client.create_post.call_count == 4
+            assert peak == 1
 
-    def test_deduplication_skips_posted_stories(self, mock_config, mock_rss_feed, sample_story, tmp_path):
+    def test_deduplication_skips_posted_stories(self, patched_deps, tmp_path):
         """Test that already-posted stories are skipped."""
         state_file = tmp_path / "state.json"
         mock_client = Mock()
         mock_client.create_post.return_value = "at://did:plc:test/social.coves.post/abc123"
 
-        with patch('src.main.ConfigLoader') as MockConfigLoader, \
-             patch('src.main.RSSFetcher') as MockRSSFetcher, \
-             patch('src.main.KagiHTMLParser') as MockHTMLParser, \
-             patch('src.main.RichTextFormatter') as MockFormatter:
+        # First run: posts all stories
+        aggregator = Aggregator(
+            config_path=Path("config.yaml"),
+            state_file=state_file,
+            coves_client=mock_client
+        )
+        aggregator.run()
+
+        # Verify first run posted stories
+        first_run_posts = mock_client.create_post.call_count
+        assert first_run_posts == 4
+
+        # Second run: should skip all (already posted)
+        mock_client.reset_mock()
+        aggregator2 = Aggregator(
+            config_path=Path("config.yaml"),
+            state_file=state_file,
+            coves_client=mock_client
+        )
+        aggregator2.run()
 
-            # Setup mocks
-            mock_loader = Mock()
-            mock_loader.load.return_value = mock_config
-            MockConfigLoader.return_value = mock_loader
+        # Should not post any (all duplicates)
+        assert mock_client.create_post.call_count == 0
 
-            mock_fetcher = Mock()
-            mock_fetcher.fetch_feed.return_value = mock_rss_feed
-            MockRSSFetcher.return_value = mock_fetcher
+    def test_continue_on_feed_error(self, patched_deps, tmp_path):
+        """Test that processing continues if one feed fails."""
+        state_file = tmp_path / "state.json"
+        mock_client = Mock()
+        # First feed fails, second succeeds
+        patched_deps.fetcher.fetch_feed.side_effect = [
+            Exception("Network error"),
+            FakeFeed()
+        ]
+
+        aggregator = Aggregator(
+            config_path=Path("config.yaml"),
+            state_file=state_file,
+            coves_client=mock_client
+        )
 
-            mock_parser = Mock()
-            mock_parser.parse_to_story.return_value = sample_story
-            MockHTMLParser.return_value = mock_parser
+        # Should not raise exception
+        aggregator.run()
 
-            mock_formatter = Mock()
-            mock_formatter.format_full.return_value = {
-                "content": "Test content",
-                "facets": []
-            }
-            MockFormatter.return_value = mock_formatter
+        # Should have attempted both feeds
+        assert patched_deps.fetcher.fetch_feed.call_count == 2
 
-            # First run: posts all stories
-            aggregator = Aggregator(
-                config_path=Path("config.yaml"),
-                state_file=state_file,
-                coves_client=mock_client
-            )
-            aggregator.run()
+    def test_feeds_are_fetched_concurrently(self, patched_deps, tmp_path):
+        """Test that enabled feeds are fetched at the same time."""
+        state_file = tmp_path / "state.json"
+        mock_client = Mock()
+        # Each fetch waits for the other; serial fetching would break the barrier
+        barrier = threading.Barrier(2, timeout=5)
 
-            # Verify first run posted stories
-            first_run_posts = mock_client.create_post.call_count
-            assert first_run_posts == 4
+        def fetch_feed(url, **kwargs):
+            barrier.wait()
+            return FakeFeed()
 
-            # Second run: should skip all (already posted)
-            mock_client.reset_mock()
-            aggregator2 = Aggregator(
-                config_path=Path("config.yaml"),
-                state_file=state_file,
-                coves_client=mock_client
-            )
-            aggregator2.run()
+        patched_deps.fetcher.fetch_feed.side_effect = fetch_feed
 
-            # Should not post any (all duplicates)
-            assert mock_client.create_post.call_count == 0
+        aggregator = Aggregator(
+            config_path=Path("config.yaml"),
+            state_file=state_file,
+            coves_client=mock_client
+        )
+        aggregator.run()
 
-    def test_continue_on_feed_error(self, mock_config, tmp_path):
-        """Test that processing continues if one feed fails."""
+        # Both feeds were fetched successfully and processed
+        assert aggregator.state_manager.get_last_run("https://news.kagi.com/world.xml") is not None
+        assert aggregator.state_manager.get_last_run("https://news.kagi.com/tech.xml") is not None
+
+    def test_not_modified_feed_is_skipped(self, patched_deps, tmp_path):
+        """Test conditional fetching: saved validators are sent and a 304 is skipped."""
         state_file = tmp_path / "state.json"
         mock_client = Mock()
+        fetch_feed = patched_deps.fetcher.fetch_feed
+        fetch_feed.return_value = FakeFeed(
+            etag='"v1"', modified="Fri, 24 Oct 2025 12:00:00 GMT", content_hash="0f1e2d"
+        )
 
-        with patch('src.main.ConfigLoader') as MockConfigLoader, \
-             patch('src.main.RSSFetcher') as MockRSSFetcher:
-
-            mock_loader = Mock()
-            mock_loader.load.return_value = mock_config
-            MockConfigLoader.return_value = mock_loader
+        # First run stores the validators
+        Aggregator(
+            config_path=Path("config.yaml"),
+            state_file=state_file,
+            coves_client=mock_client
+        ).run()
+
+        # Second run sends them and gets "not modified"
+        fetch_feed.reset_mock()
+        fetch_feed.return_value = None
+        aggregator = Aggregator(
+            config_path=Path("config.yaml"),
+            state_file=state_file,
+            coves_client=mock_client
+        )
+        aggregator.run()
 
-            mock_fetcher = Mock()
-            # First feed fails, second succeeds
-            mock_fetcher.fetch_feed.side_effect = [
-                Exception("Network error"),
-                MagicMock(bozo=0, entries=[])
-            ]
-            MockRSSFetcher.return_value = mock_fetcher
+        fetch_feed.assert_any_call(
+            "https://news.kagi.com/world.xml",
+            etag='"v1"',
+            modified="Fri, 24 Oct 2025 12:00:00 GMT",
+            content_hash="0f1e2d"
+        )
+        assert mock_client.create_post.call_count == 0
+        assert aggregator.state_manager.get_last_run("https://news.kagi.com/world.xml") is not None
 
-            aggregator = Aggregator(
-                config_path=Path("config.yaml"),
-                state_file=state_file,
-                coves_client=mock_client
-            )
+    def test_validators_not_saved_when_a_post_fails(self, mock_rss_feed, patched_deps, tmp_path):
+        """Test that a feed with failed posts is fetched in full next run."""
+        state_file = tmp_path / "state.json"
+        mock_client = Mock()
+        mock_client.create_post.side_effect = Exception("Post failed")
+        # The fixture is shared by the module, so change a copy
+        patched_deps.fetcher.fetch_feed.return_value = replace(mock_rss_feed, etag='"v1"')
 
-            # Should not raise exception
-            aggregator.run()
+        aggregator = Aggregator(
+            config_path=Path("config.yaml"),
+            state_file=state_file,
+            coves_client=mock_client
+        )
+        aggregator.run()
 
-            # Should have attempted both feeds
-            assert mock_fetcher.fetch_feed.call_count == 2
+        validators = aggregator.state_manager.get_feed_validators("https://news.kagi.com/world.xml")
+        assert validators == (None, None)
 
-    def test_handle_empty_feed(self, mock_config, tmp_path):
-        """Test handling of empty RSS feeds."""
+    def test_entries_without_link_are_skipped(self, patched_deps, tmp_path):
+        """Test that entries missing a link are skipped before parsing."""
         state_file = tmp_path / "state.json"
         mock_client = Mock()
+        entry = FakeEntry(title="No link", link="", guid="guid-1")
+        patched_deps.fetcher.fetch_feed.return_value = FakeFeed(entries=[entry], etag='"v1"')
 
-        with patch('src.main.ConfigLoader') as MockConfigLoader, \
-             patch('src.main.RSSFetcher') as MockRSSFetcher:
+        aggregator = Aggregator(
+            config_path=Path("config.yaml"),
+            state_file=state_file,
+            coves_client=mock_client
+        )
+        aggregator.run()
 
-            mock_loader = Mock()
-            mock_loader.load.return_value = mock_config
-            MockConfigLoader.return_value = mock_loader
+        patched_deps.parser.parse_to_story.assert_not_called()
+        assert mock_client.create_post.call_count == 0
+        # A malformed entry isn't a failure, so validators are still saved
+        validators = aggregator.state_manager.get_feed_validators("https://news.kagi.com/world.xml")
+        assert validators == ('"v1"', None)
 
-            mock_fetcher = Mock()
-            mock_fetcher.fetch_feed.return_value = MagicMock(bozo=0, entries=[])
-            MockRSSFetcher.return_value = mock_fetcher
+    def test_handle_empty_feed(self, patched_deps, tmp_path):
+        """Test handling of empty RSS feeds."""
+        state_file = tmp_path / "state.json"
+        mock_client = Mock()
+        patched_deps.fetcher.fetch_feed.return_value = FakeFeed()
 
-            aggregator = Aggregator(
-                config_path=Path("config.yaml"),
-                state_file=state_file,
-                coves_client=mock_client
-            )
-            aggregator.run()
+        aggregator = Aggregator(
+            config_path=Path("config.yaml"),
+            state_file=state_file,
+            coves_client=mock_client
+        )
+        aggregator.run()
 
-            # Should not post anything
-            assert mock_client.create_post.call_count == 0
+        # Should not post anything
+        assert mock_client.create_post.call_count == 0
 
-    def test_dont_update_state_on_failed_post(self, mock_config, mock_rss_feed, sample_story, tmp_path):
+    def test_dont_update_state_on_failed_post(self, patched_deps, tmp_path):
         """Test that state is not updated if posting fails."""
         state_file = tmp_path / "state.json"
         mock_client = Mock()
         mock_client.create_post.side_effect = Exception("Post failed")
 
-        with patch('src.main.ConfigLoader') as MockConfigLoader, \
-             patch('src.main.RSSFetcher') as MockRSSFetcher, \
-             patch('src.main.KagiHTMLParser') as MockHTMLParser, \
-             patch('src.main.RichTextFormatter') as MockFormatter:
-
-            # Setup mocks
-            mock_loader = Mock()
-            mock_loader.load.return_value = mock_config
-            MockConfigLoader.return_value = mock_loader
-
-            mock_fetcher = Mock()
-            mock_fetcher.fetch_feed.return_value = mock_rss_feed
-            MockRSSFetcher.return_value = mock_fetcher
-
-            mock_parser = Mock()
-            mock_parser.parse_to_story.return_value = sample_story
-            MockHTMLParser.return_value = mock_parser
-
-            mock_formatter = Mock()
-            mock_formatter.format_full.return_value = {
-                "content": "Test content",
-                "facets": []
-            }
-            MockFormatter.return_value = mock_formatter
-
-            # Run aggregator (posts will fail)
-            aggregator = Aggregator(
-                config_path=Path("config.yaml"),
-                state_file=state_file,
-                coves_client=mock_client
-            )
-            aggregator.run()
+        # Run aggregator (posts will fail)
+        aggregator = Aggregator(
+            config_path=Path("config.yaml"),
+            state_file=state_file,
+            coves_client=mock_client
+        )
+        aggregator.run()
 
-            # Reset client to succeed
-            mock_client.reset_mock()
-            mock_client.create_post.return_value = "at://did:plc:test/social.coves.post/abc123"
+        # Reset client to succeed
+        mock_client.reset_mock()
+        mock_client.create_post.return_value = "at://did:plc:test/social.coves.post/abc123"
 
-            # Second run: should try to post again (state wasn't updated)
-            aggregator2 = Aggregator(
-                config_path=Path("config.yaml"),
-                state_file=state_file,
-                coves_client=mock_client
-            )
-            aggregator2.run()
+        # Second run: should try to post again (state wasn't updated)
+        aggregator2 = Aggregator(
+            config_path=Path("config.yaml"),
+            state_file=state_file,
+            coves_client=mock_client
+        )
+        aggregator2.run()
 
-            # Should post stories (they weren't marked as posted)
-            assert mock_client.create_post.call_count == 4
+        # Should post stories (they weren't marked as posted)
+        assert mock_client.create_post.call_count == 4
 
-    def test_update_last_run_timestamp(self, mock_config, tmp_path):
+    def test_update_last_run_timestamp(self, patched_deps, tmp_path):
         """Test that last_run timestamp is updated after successful processing."""
         state_file = tmp_path / "state.json"
         mock_client = Mock()
+        patched_deps.fetcher.fetch_feed.return_value = FakeFeed()
 
-        with patch('src.main.ConfigLoader') as MockConfigLoader, \
-             patch('src.main.RSSFetcher') as MockRSSFetcher:
-
-            mock_loader = Mock()
-            mock_loader.load.return_value = mock_config
-            MockConfigLoader.return_value = mock_loader
-
-            mock_fetcher = Mock()
-            mock_fetcher.fetch_feed.return_value = MagicMock(bozo=0, entries=[])
-            MockRSSFetcher.return_value = mock_fetcher
-
-            aggregator = Aggregator(
-                config_path=Path("config.yaml"),
-                state_file=state_file,
-                coves_client=mock_client
-            )
-            aggregator.run()
+        aggregator = Aggregator(
+            config_path=Path("config.yaml"),
+            state_file=state_file,
+            coves_client=mock_client
+        )
+        aggregator.run()
 
-            # Verify last_run was updated for both feeds
-            feed1_last_run = aggregator.state_manager.get_last_run(
-                "https://news.kagi.com/world.xml"
-            )
-            feed2_last_run = aggregator.state_manager.get_last_run(
-                "https://news.kagi.com/tech.xml"
-            )
+        # Verify last_run was updated for both feeds
+        feed1_last_run = aggregator.state_manager.get_last_run(
+            "https://news.kagi.com/world.xml"
+        )
+        feed2_last_run = aggregator.state_manager.get_last_run(
+            "https://news.kagi.com/tech.xml"
+        )
 
-            assert feed1_last_run is not None
-            assert feed2_last_run is not None
+        assert feed1_last_run is not None
+        assert feed2_last_run is not None
+        # Both feeds record the same run start time
+        assert feed1_last_run == feed2_last_run
 
-    def test_create_post_with_image_embed(self, mock_config, mock_rss_feed, sample_story, tmp_path):
+    def test_create_post_with_image_embed(self, mock_rss_feed, sample_story, patched_deps, tmp_path):
         """Test that posts include external image embeds."""
         state_file = tmp_path / "state.json"
         mock_client = Mock()
@@ -414,53 +532,30 @@ class TestAggregator:
             }
         }
 
-        with patch('src.main.ConfigLoader') as MockConfigLoader, \
-             patch('src.main.RSSFetcher') as MockRSSFetcher, \
-             patch('src.main.KagiHTMLParser') as MockHTMLParser, \
-             patch('src.main.RichTextFormatter') as MockFormatter:
-
-            # Setup mocks
-            mock_loader = Mock()
-            mock_loader.load.return_value = mock_config
-            MockConfigLoader.return_value = mock_loader
-
-            mock_fetcher = Mock()
-            # Only one entry for simplicity
-            single_entry_feed = MagicMock(bozo=0, entries=[mock_rss_feed.entries[0]])
-            mock_fetcher.fetch_feed.return_value = single_entry_feed
-            MockRSSFetcher.return_value = mock_fetcher
-
-            mock_parser = Mock()
-            mock_parser.parse_to_story.return_value = sample_story
-            MockHTMLParser.return_value = mock_parser
+        # Only one entry for simplicity
+        single_entry_feed = FakeFeed(entries=[mock_rss_feed.entries[0]])
+        patched_deps.fetcher.fetch_feed.return_value = single_entry_feed
 
-            mock_formatter = Mock()
-            mock_formatter.format_full.return_value = {
-                "content": "Test content",
-                "facets": []
-            }
-            MockFormatter.return_value = mock_formatter
-
-            # Run aggregator
-            aggregator = Aggregator(
-                config_path=Path("config.yaml"),
-                state_file=state_file,
-                coves_client=mock_client
-            )
-            aggregator.run()
+        # Run aggregator
+        aggregator = Aggregator(
+            config_path=Path("config.yaml"),
+            state_file=state_file,
+            coves_client=mock_client
+        )
+        aggregator.run()
 
-            # Verify create_post was called with embed
-            mock_client.create_post.assert_called()
-            call_kwargs = mock_client.create_post.call_args.kwargs
+        # Verify create_post was called with embed
+        mock_client.create_post.assert_called()
+        call_kwargs = mock_client.create_post.call_args.kwargs
 
-            assert "embed" in call_kwargs
-            assert call_kwargs["embed"]["$type"] == "social.coves.embed.external"
-            assert call_kwargs["embed"]["external"]["uri"] == sample_story.link
-            assert call_kwargs["embed"]["external"]["title"] == sample_story.title
-            # Thumbnail is not included - server's unfurl service handles it
-            assert "thumb" not in call_kwargs["embed"]["external"]
+        assert "embed" in call_kwargs
+        assert call_kwargs["embed"]["$type"] == "social.coves.embed.external"
+        assert call_kwargs["embed"]["external"]["uri"] == sample_story.link
+        assert call_kwargs["embed"]["external"]["title"] == sample_story.title
+        # Thumbnail is not included - server's unfurl service handles it
+        assert "thumb" not in call_kwargs["embed"]["external"]
 
-    def test_create_post_with_sources_in_embed(self, mock_config, mock_rss_feed, sample_story, tmp_path):
+    def test_create_post_with_sources_in_embed(self, mock_rss_feed, sample_story, patched_deps, tmp_path):
         """Test that posts include sources in external embeds when available."""
         state_file = tmp_path / "state.json"
         mock_client = Mock()
@@ -479,52 +574,29 @@ class TestAggregator:
             }
         }
 
-        with patch('src.main.ConfigLoader') as MockConfigLoader, \
-             patch('src.main.RSSFetcher') as MockRSSFetcher, \
-             patch('src.main.KagiHTMLParser') as MockHTMLParser, \
-             patch('src.main.RichTextFormatter') as MockFormatter:
-
-            # Setup mocks
-            mock_loader = Mock()
-            mock_loader.load.return_value = mock_config
-            MockConfigLoader.return_value = mock_loader
-
-            mock_fetcher = Mock()
-            single_entry_feed = MagicMock(bozo=0, entries=[mock_rss_feed.entries[0]])
-            mock_fetcher.fetch_feed.return_value = single_entry_feed
-            MockRSSFetcher.return_value = mock_fetcher
-
-            mock_parser = Mock()
-            mock_parser.parse_to_story.return_value = sample_story
-            MockHTMLParser.return_value = mock_parser
+        single_entry_feed = FakeFeed(entries=[mock_rss_feed.entries[0]])
+        patched_deps.fetcher.fetch_feed.return_value = single_entry_feed
 
-            mock_formatter = Mock()
-            mock_formatter.format_full.return_value = {
-                "content": "Test content",
-                "facets": []
-            }
-            MockFormatter.return_value = mock_formatter
-
-            # Run aggregator
-            aggregator = Aggregator(
-                config_path=Path("config.yaml"),
-                state_file=state_file,
-                coves_client=mock_client
-            )
-            aggregator.run()
+        # Run aggregator
+        aggregator = Aggregator(
+            config_path=Path("config.yaml"),
+            state_file=state_file,
+            coves_client=mock_client
+        )
+        aggregator.run()
 
-            # Verify create_external_embed was called with sources
-            mock_client.create_external_embed.assert_called()
-            call_kwargs = mock_client.create_external_embed.call_args.kwargs
+        # Verify create_external_embed was called with sources
+        mock_client.create_external_embed.assert_called()
+        call_kwargs = mock_client.create_external_embed.call_args.kwargs
 
-            # Verify sources were passed
-            assert "sources" in call_kwargs
-            assert len(call_kwargs["sources"]) == 1
-            assert call_kwargs["sources"][0]["uri"] == "https://example.com/1"
-            assert call_kwargs["sources"][0]["title"] == "Source 1"
-            assert call_kwargs["sources"][0]["domain"] == "example.com"
+        # Verify sources were passed
+        assert "sources" in call_kwargs
+        assert len(call_kwargs["sources"]) == 1
+        assert call_kwargs["sources"][0]["uri"] == "https://example.com/1"
+        assert call_kwargs["sources"][0]["title"] == "Source 1"
+        assert call_kwargs["sources"][0]["domain"] == "example.com"
 
-    def test_create_post_without_sources(self, mock_config, mock_rss_feed, tmp_path):
+    def test_create_post_without_sources(self, mock_rss_feed, patched_deps, tmp_path):
         """Test that posts without sources don't include sources in embed."""
         state_file = tmp_path / "state.json"
         mock_client = Mock()
@@ -556,43 +628,48 @@ class TestAggregator:
             }
         }
 
-        with patch('src.main.ConfigLoader') as MockConfigLoader, \
-             patch('src.main.RSSFetcher') as MockRSSFetcher, \
-             patch('src.main.KagiHTMLParser') as MockHTMLParser, \
-             patch('src.main.RichTextFormatter') as MockFormatter:
+        single_entry_feed = FakeFeed(entries=[mock_rss_feed.entries[0]])
+        patched_deps.fetcher.fetch_feed.return_value = single_entry_feed
+        patched_deps.parser.parse_to_story.return_value = story_without_sources
 
-            # Setup mocks
-            mock_loader = Mock()
-            mock_loader.load.return_value = mock_config
-            MockConfigLoader.return_value = mock_loader
+        # Run aggregator
+        aggregator = Aggregator(
+            config_path=Path("config.yaml"),
+            state_file=state_file,
+            coves_client=mock_client
+        )
+        aggregator.run()
 
-            mock_fetcher = Mock()
-            single_entry_feed = MagicMock(bozo=0, entries=[mock_rss_feed.entries[0]])
-            mock_fetcher.fetch_feed.return_value = single_entry_feed
-            MockRSSFetcher.return_value = mock_fetcher
+        # Verify create_external_embed was called
+        mock_client.create_external_embed.assert_called()
+        call_kwargs = mock_client.create_external_embed.call_args.kwargs
 
-            mock_parser = Mock()
-            mock_parser.parse_to_story.return_value = story_without_sources
-            MockHTMLParser.return_value = mock_parser
+        # Verify sources is None (empty list becomes None)
+        assert call_kwargs.get("sources") is None
 
-            mock_formatter = Mock()
-            mock_formatter.format_full.return_value = {
-                "content": "Test content",
-                "facets": []
-            }
-            MockFormatter.return_value = mock_formatter
+    def test_canonical_guid_prefers_entry_guid(self):
+        """Test that an entry's own GUID is used unchanged."""
+        entry = Mock(guid="https://kite.kagi.com/test/world/1?utm_source=rss",
+                     link="https://kite.kagi.com/test/world/1")
 
-            # Run aggregator
-            aggregator = Aggregator(
-                config_path=Path("config.yaml"),
-                state_file=state_file,
-                coves_client=mock_client
-            )
-            aggregator.run()
+        assert Aggregator._canonical_guid(entry) == "https://kite.kagi.com/test/world/1?utm_source=rss"
+
+    def test_canonical_guid_strips_tracking_params_from_link(self):
+        """Test that link fallbacks drop tracking parameters but keep others."""
+        entry = Mock(spec=['link'])
+        entry.link = "https://example.com/story?id=7&utm_source=rss&utm_medium=feed&fbclid=abc"
+        assert Aggregator._canonical_guid(entry) == "https://example.com/story?id=7"
 
-            # Verify create_external_embed was called
-            mock_client.create_external_embed.assert_called()
-            call_kwargs = mock_client.create_external_embed.call_args.kwargs
+        entry.link = "https://example.com/story?q=a%20b"
+        assert Aggregator._canonical_guid(entry) == "https://example.com/story?q=a%20b"
+
+    def test_entry_categories(self):
+        """Test that category terms are read from tags, defaulting to empty."""
+        feed = feedparser.parse(
+            "<rss><channel><item><title>A</title><category>World</category>"
+            "<category>World/Diplomacy</category></item><item><title>B</title></item>"
+            "</channel></rss>"
+        )
 
-            # Verify sources is None (empty list becomes None)
-            assert call_kwargs.get("sources") is None
+        assert Aggregator._entry_categories(feed.entries[0]) == ["World", "World/Diplomacy"]
+        assert Aggregator._entry_categories(feed.entries[1]) == []
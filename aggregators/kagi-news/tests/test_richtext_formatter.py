@@ -5,8 +5,9 @@ Tests conversion of KagiStory to Coves rich text format with facets.
 """
 import pytest
 from datetime import datetime
+from dataclasses import replace
 
-from src.richtext_formatter import RichTextFormatter
+from src.richtext_formatter import RichTextBuilder, RichTextFormatter
 from src.models import KagiStory, Perspective, Quote, Source
 
 
@@ -297,3 +298,51 @@ class TestRichTextFormatter:
                     # Check if they overlap
                     overlaps = (start1 < end2 and start2 < end1)
                     assert not overlaps, f"Overlapping facets of type {ftype}: {f1} and {f2}"
+
+    def test_facets_are_ordered_by_byte_start(self, sample_story):
+        """Test that facets come out in increasing byteStart order."""
+        formatter = RichTextFormatter()
+        result = formatter.format_full(sample_story)
+
+        starts = [f['index']['byteStart'] for f in result['facets']]
+        assert starts == sorted(starts)
+        assert len(set(starts)) == len(starts)
+
+    def test_facets_after_fixed_strings_cover_their_text(self, sample_story):
+        """Test that precomputed lengths of fixed strings keep facets aligned."""
+        formatter = RichTextFormatter()
+        result = formatter.format_full(sample_story)
+
+        content_bytes = result['content'].encode('utf-8')
+        facet_texts = [
+            content_bytes[f['index']['byteStart']:f['index']['byteEnd']].decode('utf-8')
+            for f in result['facets']
+        ]
+
+        assert "Highlights:" in facet_texts
+        assert "Sources:" in facet_texts
+        assert facet_texts[-1] == "Kagi News"
+
+    def test_format_full_reflects_edited_story(self, sample_story):
+        """Test that a story edited under the same guid is formatted from its new content."""
+        formatter = RichTextFormatter()
+
+        first = formatter.format_full(sample_story)
+        first['facets'].clear()
+        edited = replace(sample_story, summary="Edited summary")
+        second = formatter.format_full(edited)
+
+        assert second['content'].startswith("Edited summary")
+        assert second['facets']
+
+    def test_builder_can_extend_after_build(self):
+        """Test that a built builder keeps its content and offsets."""
+        builder = RichTextBuilder()
+        builder.add_text("Café ")
+        first = builder.build()
+        builder.add_bold("bold")
+        second = builder.build()
+
+        assert first['content'] == "Café "
+        assert second['content'] == "Café bold"
+        assert second['facets'][0]['index'] == {'byteStart': 6, 'byteEnd': 10}
@@ -4,6 +4,7 @@ Tests for RSS feed fetching functionality.
 import pytest
 import responses
 from pathlib import Path
+from unittest.mock import patch
 
 from src.rss_fetcher import RSSFetcher
 
@@ -45,6 +46,41 @@ class TestRSSFetcher:
         assert len(feed.entries) == 1
         assert feed.entries[0].title == "Test Story"
 
+    @responses.activate
+    def test_fetch_feed_reuses_session(self, sample_rss_feed):
+        """Test that repeated fetches go through one persistent session."""
+        url = "https://news.kagi.com/world.xml"
+        responses.add(responses.GET, url, body=sample_rss_feed, status=200)
+
+        fetcher = RSSFetcher()
+        session = fetcher.session
+        fetcher.fetch_feed(url)
+        fetcher.fetch_feed(url)
+
+        assert fetcher.session is session
+        assert len(responses.calls) == 2
+
+    @pytest.mark.parametrize("pool_maxsize,expected", [(None, RSSFetcher.POOL_MAXSIZE), (16, 16)])
+    def test_pool_size_matches_concurrent_fetches(self, pool_maxsize, expected):
+        """Test that the keep-alive pool can hold one connection per concurrent fetch."""
+        fetcher = RSSFetcher(pool_maxsize=pool_maxsize)
+
+        adapter = fetcher.session.get_adapter("https://news.kagi.com/world.xml")
+        assert adapter._pool_maxsize == expected
+
+    @responses.activate
+    def test_fetch_feed_from_raw_bytes(self, sample_rss_feed):
+        """Test that a pre-downloaded body is parsed without a request."""
+        url = "https://news.kagi.com/world.xml"
+
+        fetcher = RSSFetcher()
+        feed = fetcher.fetch_feed(url, raw_bytes=sample_rss_feed.encode('utf-8'))
+
+        assert feed.feed.title == "Kagi News - World"
+        assert len(feed.entries) == 1
+        assert feed['etag'] is None
+        assert len(responses.calls) == 0
+
     @responses.activate
     def test_fetch_feed_timeout(self):
         """Test fetch with timeout."""
@@ -71,6 +107,50 @@ class TestRSSFetcher:
         assert feed is not None
         assert len(feed.entries) == 1
 
+    @responses.activate
+    def test_fetch_feed_returns_validators(self, sample_rss_feed):
+        """Test that ETag and Last-Modified are returned with the feed."""
+        url = "https://news.kagi.com/world.xml"
+        responses.add(
+            responses.GET, url, body=sample_rss_feed, status=200,
+            headers={"ETag": '"abc123"', "Last-Modified": "Fri, 24 Oct 2025 12:00:00 GMT"}
+        )
+
+        feed = RSSFetcher().fetch_feed(url)
+
+        assert feed.etag == '"abc123"'
+        assert feed.modified == "Fri, 24 Oct 2025 12:00:00 GMT"
+
+    @responses.activate
+    def test_fetch_feed_unchanged_body_is_not_parsed(self, sample_rss_feed):
+        """Test that a 200 with the same body as last time is treated as not modified."""
+        url = "https://news.kagi.com/world.xml"
+        responses.add(responses.GET, url, body=sample_rss_feed, status=200)
+        fetcher = RSSFetcher()
+
+        first = fetcher.fetch_feed(url)
+        with patch('src.rss_fetcher.feedparser.parse') as mock_parse:
+            second = fetcher.fetch_feed(url, content_hash=first.content_hash)
+
+        assert len(first.entries) == 1
+        assert second is None
+        mock_parse.assert_not_called()
+
+    @responses.activate
+    def test_fetch_feed_not_modified(self):
+        """Test that a conditional fetch of an unchanged feed returns None."""
+        url = "https://news.kagi.com/world.xml"
+        responses.add(responses.GET, url, status=304)
+
+        feed = RSSFetcher().fetch_feed(
+            url, etag='"abc123"', modified="Fri, 24 Oct 2025 12:00:00 GMT"
+        )
+
+        assert feed is None
+        request = responses.calls[0].request
+        assert request.headers["If-None-Match"] == '"abc123"'
+        assert request.headers["If-Modified-Since"] == "Fri, 24 Oct 2025 12:00:00 GMT"
+
     @responses.activate
     def test_fetch_feed_invalid_xml(self):
         """Test handling of invalid XML."""
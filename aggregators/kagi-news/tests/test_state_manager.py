@@ -6,8 +6,10 @@ Tests deduplication state tracking and persistence.
 import pytest
 import json
 import tempfile
+import threading
 from pathlib import Path
 from datetime import datetime, timedelta
+from unittest.mock import patch
 
 from src.state_manager import StateManager
 
@@ -36,6 +38,15 @@ class TestStateManager:
         assert 'feeds' in state
         assert state['feeds'] == {}
 
+    def test_corrupt_state_file_is_replaced(self, temp_state_file):
+        """Test that an unreadable state file is replaced with an empty state."""
+        temp_state_file.write_text('{"feeds": {')
+
+        manager = StateManager(temp_state_file)
+
+        assert manager.state == {'feeds': {}}
+        assert json.loads(temp_state_file.read_text()) == {'feeds': {}}
+
     def test_is_posted_returns_false_for_new_guid(self, temp_state_file):
         """Test that is_posted returns False for new GUIDs."""
         manager = StateManager(temp_state_file)
@@ -147,6 +158,32 @@ class TestStateManager:
         assert manager.is_posted(feed_url, "https://kite.kagi.com/test/world/149")
         assert manager.is_posted(feed_url, "https://kite.kagi.com/test/world/100")
 
+    def test_is_posted_reflects_cleanup_without_reload(self, temp_state_file):
+        """Test that GUIDs dropped by cleanup stop matching on the same instance."""
+        manager = StateManager(temp_state_file, max_guids_per_feed=3)
+        feed_url = "https://news.kagi.com/world.xml"
+
+        for i in range(5):
+            manager.mark_posted(feed_url, f"guid-{i}", f"at://test/{i}")
+            assert manager.is_posted(feed_url, f"guid-{i}")
+
+        assert not manager.is_posted(feed_url, "guid-0")
+        assert not manager.is_posted(feed_url, "guid-1")
+        assert manager.is_posted(feed_url, "guid-4")
+
+    def test_posted_guids_returns_snapshot(self, temp_state_file):
+        """Test that posted_guids returns the feed's GUIDs as an independent set."""
+        manager = StateManager(temp_state_file)
+        feed_url = "https://news.kagi.com/world.xml"
+        manager.mark_posted(feed_url, "guid-1", "at://test/1")
+
+        guids = manager.posted_guids(feed_url)
+        guids.add("guid-2")
+
+        assert guids == {"guid-1", "guid-2"}
+        assert not manager.is_posted(feed_url, "guid-2")
+        assert manager.posted_guids("https://news.kagi.com/tech.xml") == set()
+
     def test_multiple_feeds_tracked_separately(self, temp_state_file):
         """Test that multiple feeds are tracked independently."""
         manager = StateManager(temp_state_file)
@@ -225,3 +262,54 @@ class TestStateManager:
         # Old entry should be gone
         assert not manager.is_posted(feed_url, "old-guid")
         assert manager.is_posted(feed_url, "new-guid")
+
+    def test_concurrent_mark_posted(self, temp_state_file):
+        """Test that marks from several threads are all recorded."""
+        manager = StateManager(temp_state_file, max_guids_per_feed=1000)
+        feed_url = "https://news.kagi.com/world.xml"
+
+        def mark_range(start):
+            for i in range(start, start + 25):
+                manager.mark_posted(feed_url, f"guid-{i}", f"at://post/{i}")
+
+        threads = [threading.Thread(target=mark_range, args=(n * 25,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert manager.get_posted_count(feed_url) == 100
+        assert StateManager(temp_state_file).get_posted_count(feed_url) == 100
+
+    def test_mark_posted_buffered_saves_on_flush(self, temp_state_file):
+        """Test that buffered marks are visible at once and written by flush()."""
+        manager = StateManager(temp_state_file)
+        feed_url = "https://news.kagi.com/world.xml"
+
+        manager.mark_posted_buffered(feed_url, "guid-1", "at://test/1")
+        manager.mark_posted_buffered(feed_url, "guid-2", "at://test/2")
+
+        assert manager.is_posted(feed_url, "guid-1")
+        assert not StateManager(temp_state_file).is_posted(feed_url, "guid-1")
+
+        manager.flush()
+
+        reloaded = StateManager(temp_state_file)
+        assert reloaded.is_posted(feed_url, "guid-1")
+        assert reloaded.is_posted(feed_url, "guid-2")
+        assert not temp_state_file.with_suffix('.json.tmp').exists()
+
+    def test_buffered_marks_are_cleaned_up_on_flush(self, temp_state_file):
+        """Test that a batch of buffered marks is trimmed once, when it is saved."""
+        manager = StateManager(temp_state_file, max_guids_per_feed=3)
+        feed_url = "https://news.kagi.com/world.xml"
+
+        with patch.object(manager, 'cleanup_old_entries', wraps=manager.cleanup_old_entries) as cleanup:
+            for i in range(5):
+                manager.mark_posted_buffered(feed_url, f"guid-{i}", f"at://test/{i}")
+            manager.flush()
+
+        assert cleanup.call_count == 1
+        assert manager.get_posted_count(feed_url) == 3
+        assert not manager.is_posted(feed_url, "guid-0")
+        assert StateManager(temp_state_file).is_posted(feed_url, "guid-4")